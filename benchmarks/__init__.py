@@ -0,0 +1,9 @@
+"""Benchmarks for the htmlgen rendering pipeline.
+
+Run all benchmarks and print the results as JSON:
+
+    $ python -m benchmarks
+
+Run "python -m benchmarks --help" for a list of options.
+
+"""
@@ -0,0 +1,66 @@
+import argparse
+import json
+import sys
+
+from .runner import run
+from .workloads import WORKLOADS
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Benchmark the htmlgen rendering pipeline.",
+    )
+    parser.add_argument(
+        "workloads",
+        nargs="*",
+        metavar="WORKLOAD",
+        help="workloads to run (default: all of {})".format(
+            ", ".join(WORKLOADS)
+        ),
+    )
+    parser.add_argument(
+        "-n",
+        "--repeat",
+        type=int,
+        default=5,
+        help="number of timed runs per workload (default: %(default)s)",
+    )
+    parser.add_argument(
+        "-s",
+        "--scale",
+        type=float,
+        default=1.0,
+        help="factor for the workload sizes (default: %(default)s)",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        help="write the results to this file instead of stdout",
+    )
+    parser.add_argument(
+        "-q", "--quiet", action="store_true", help="do not report progress"
+    )
+    args = parser.parse_args()
+    for name in args.workloads:
+        if name not in WORKLOADS:
+            parser.error("unknown workload '{}'".format(name))
+    if args.repeat < 1:
+        parser.error("--repeat must be at least 1")
+    results = run(
+        args.workloads or None,
+        scale=args.scale,
+        repeat=args.repeat,
+        progress=None if args.quiet else sys.stderr,
+    )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+"""Run workloads and collect timing and allocation statistics.
+
+Only API that is available in all htmlgen 3.x releases is used, so that
+the benchmarks can be run against older releases for comparison.
+
+"""
+
+import gc
+import os.path
+import platform
+import re
+import time
+import tracemalloc
+from statistics import median
+
+import htmlgen
+
+from .workloads import WORKLOADS
+
+
+def htmlgen_version():
+    """Return the htmlgen version, or None if unknown.
+
+    When htmlgen is imported from a source checkout, the version is read
+    from pyproject.toml.
+
+    """
+    pyproject = os.path.join(
+        os.path.dirname(os.path.dirname(htmlgen.__file__)), "pyproject.toml"
+    )
+    try:
+        with open(pyproject, encoding="utf-8") as f:
+            match = re.search(r'^version = "([^"]+)"', f.read(), re.M)
+    except OSError:
+        match = None
+    if match is not None:
+        return match.group(1)
+    try:
+        from importlib.metadata import version, PackageNotFoundError
+    except ImportError:  # Python 3.7
+        return None
+    try:
+        return version("htmlgen")
+    except PackageNotFoundError:
+        return None
+
+
+def environment():
+    """Return a description of the benchmark environment."""
+    return {
+        "htmlgen": htmlgen_version(),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+    }
+
+
+def _time(function, repeat):
+    """Call function repeat times and return the durations in seconds.
+
+    Like timeit, the garbage collector is disabled while timing.
+
+    """
+    timings = []
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            function()
+            timings.append(time.perf_counter() - start)
+    finally:
+        if gc_enabled:
+            gc.enable()
+    return timings
+
+
+def _allocations(function):
+    """Call function and return retained memory blocks and peak memory.
+
+    The number of retained blocks is the number of memory blocks allocated
+    by function that are still alive when it returns, including its return
+    value. The peak memory is the maximum number of bytes allocated at any
+    one time while function runs.
+
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        result = function()
+        after = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    blocks = sum(
+        stat.count_diff
+        for stat in after.compare_to(before, "filename")
+        if stat.count_diff > 0
+    )
+    return blocks, peak
+
+
+def _render(tree):
+    return list(iter(tree))
+
+
+def _count_nodes(tree):
+    """Return the number of generators in a tree, including the root."""
+    count = 0
+    stack = [iter((tree,))]
+    while stack:
+        for item in stack[-1]:
+            if not isinstance(item, (str, bytes)):
+                count += 1
+                stack.append(_iter_children(item))
+                break
+        else:
+            stack.pop()
+    return count
+
+
+def _iter_children(item):
+    # generate() of elements renders the children generator into bytes,
+    # so it is walked separately.
+    generate_children = getattr(item, "generate_children", None)
+    if generate_children is None:
+        return iter(item.generate())
+    children = generate_children()
+    if hasattr(children, "generate"):
+        return iter((children,))
+    return iter(children)
+
+
+def run_workload(name, scale=1.0, repeat=5):
+    """Run a single workload and return its statistics.
+
+    The tree is built repeat times and each tree is rendered once.
+    Durations are given in seconds, sizes in bytes.
+
+    """
+    build = WORKLOADS[name]
+    trees = []
+    build_times = _time(lambda: trees.append(build(scale)), repeat)
+    tree = trees[0]
+    output_size = sum(len(item) for item in _render(tree))
+    nodes = _count_nodes(tree)
+    render_times = []
+    for t in trees:
+        render_times.extend(_time(lambda: _render(t), 1))
+    del trees[:]
+    build_blocks, build_peak = _allocations(lambda: build(scale))
+    render_blocks, render_peak = _allocations(lambda: _render(tree))
+    render_time = median(render_times)
+    return {
+        "name": name,
+        "scale": scale,
+        "repeat": repeat,
+        "nodes": nodes,
+        "output_bytes": output_size,
+        "build": {
+            "min": min(build_times),
+            "median": median(build_times),
+            "per_node": median(build_times) / nodes,
+            "retained_blocks": build_blocks,
+            "peak_memory": build_peak,
+        },
+        "render": {
+            "min": min(render_times),
+            "median": render_time,
+            "per_node": render_time / nodes,
+            "nodes_per_second": nodes / render_time,
+            "bytes_per_second": output_size / render_time,
+            "retained_blocks": render_blocks,
+            "peak_memory": render_peak,
+        },
+    }
+
+
+def run(names=None, scale=1.0, repeat=5, progress=None):
+    """Run workloads and return a JSON-serializable result.
+
+    names is a list of workload names. By default, all workloads are run.
+    If progress is given, the name of each workload is written to it
+    before the workload is run.
+
+    Workloads that fail are reported with an error message instead of
+    statistics. For example, older releases render recursively and can
+    not render the deeply nested workloads.
+
+    """
+    if names is None:
+        names = list(WORKLOADS)
+    results = []
+    for name in names:
+        if progress is not None:
+            progress.write(name + "\n")
+            progress.flush()
+        try:
+            result = run_workload(name, scale, repeat)
+        except Exception as exc:
+            result = {
+                "name": name,
+                "scale": scale,
+                "error": "{}: {}".format(type(exc).__name__, exc),
+            }
+        results.append(result)
+    return {"environment": environment(), "benchmarks": results}
@@ -0,0 +1,92 @@
+"""Workloads used by the benchmark runner.
+
+Each workload is a function that takes a scale factor and returns a
+freshly built tree. A scale of 1.0 corresponds to the sizes mentioned in
+the docstrings.
+
+"""
+
+from htmlgen import (
+    Division,
+    Document,
+    Form,
+    Input,
+    Paragraph,
+    Select,
+    Span,
+    Table,
+)
+
+
+def _scaled(n, scale):
+    return max(1, int(n * scale))
+
+
+def table(scale=1.0):
+    """A table with 10,000 rows of three cells each."""
+    t = Table()
+    t.add_css_classes("data")
+    for i in range(_scaled(10000, scale)):
+        t.create_simple_row(str(i), "Item #{}".format(i), "<{}>".format(i))
+    return t
+
+
+def select(scale=1.0):
+    """A selection list with 5,000 options."""
+    s = Select("choice")
+    for i in range(_scaled(5000, scale)):
+        s.create_option("Option {}".format(i), "v{}".format(i))
+    s.selected_value = "v0"
+    return s
+
+
+def nested_divisions(scale=1.0):
+    """Ten chains of 1,000 nested divisions each."""
+    root = Division()
+    for i in range(_scaled(10, scale)):
+        parent = root
+        for depth in range(1000):
+            child = Division()
+            child.add_css_classes("level-{}".format(depth))
+            parent.append(child)
+            parent = child
+        parent.append(Span("leaf {}".format(i)))
+    return root
+
+
+def document(scale=1.0):
+    """A document with 500 stylesheets and 500 scripts."""
+    doc = Document(title="Benchmark")
+    for i in range(_scaled(500, scale)):
+        doc.add_stylesheet("/static/style-{}.css".format(i))
+        doc.add_script("/static/script-{}.js".format(i))
+    doc.append_body(Paragraph("Content"))
+    return doc
+
+
+def input_form(scale=1.0):
+    """A form with 2,000 inputs with many attributes each."""
+    form = Form("POST", "/submit")
+    for i in range(_scaled(2000, scale)):
+        input_ = Input("text", "field-{}".format(i))
+        input_.id = "field-{}".format(i)
+        input_.value = "value & {}".format(i)
+        input_.placeholder = "Enter value {}...".format(i)
+        input_.size = 20
+        input_.autocomplete = "off"
+        input_.readonly = i % 2 == 0
+        input_.add_css_classes("input", "input-text", "field")
+        input_.set_style("width", "100%")
+        input_.data["index"] = str(i)
+        input_.data["group"] = str(i % 10)
+        form.append(input_)
+    return form
+
+
+WORKLOADS = {
+    "table": table,
+    "select": select,
+    "nested_divisions": nested_divisions,
+    "document": document,
+    "input_form": input_form,
+}
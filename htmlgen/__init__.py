@@ -11,6 +11,15 @@ from .attribute import (
     css_class_attribute,
 )
 from .block import Division, Paragraph, Preformatted
+from .cache import (
+    CacheInfo,
+    DirectoryCache,
+    FragmentCache,
+    MemoizedGenerator,
+    memoize,
+)
+from .compress import CompressedOutput
+from .deferred import Deferred
 from .document import (
     Document,
     HTMLRoot,
@@ -24,6 +33,7 @@ from .document import (
     json_script,
 )
 from .element import ElementBase, Element, VoidElement, is_element
+from .etag import HashedOutput, etag_matches
 from .form import (
     Autocomplete,
     Form,
@@ -49,7 +59,14 @@ from .form import (
 from .generator import (
     Generator,
     NullGenerator,
+    RenderContext,
+    RenderBudget,
+    RenderBudgetExceeded,
+    DeferredOutlet,
     IteratorGenerator,
+    FutureGenerator,
+    FrozenGenerator,
+    InternTable,
     ChildGenerator,
     HTMLChildGenerator,
     JoinGenerator,
@@ -57,6 +74,8 @@ from .generator import (
     GenValue,
     GenValueGenerator,
     generate_html_string,
+    frozen,
+    interned,
 )
 from .image import Image
 from .inline import (
@@ -77,6 +96,8 @@ from .list import (
     DescriptionDefinition,
     DescriptionTerm,
 )
+from .profiler import RenderProfiler, ClassProfile
+from .sink import FileDescriptorSink, SocketSink
 from .structure import (
     Section,
     Article,
@@ -96,5 +117,12 @@ from .table import (
     ColumnGroup,
     Column,
 )
+from .template import (
+    Slot,
+    TextSlot,
+    Template,
+    TemplateGenerator,
+    compile_template,
+)
 from .time import Time
 from .video import Preload, Video
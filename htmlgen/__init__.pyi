@@ -1,14 +1,21 @@
 from .attribute import *
 from .block import *
+from .cache import *
+from .compress import *
+from .deferred import *
 from .document import *
 from .element import *
+from .etag import *
 from .form import *
 from .generator import *
 from .image import *
 from .inline import *
 from .link import *
 from .list import *
+from .profiler import *
+from .sink import *
 from .structure import *
 from .table import *
+from .template import *
 from .time import *
 from .video import *
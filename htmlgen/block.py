@@ -13,6 +13,8 @@ class Division(Element):
         >>> div.append("This is more text.")
     """
 
+    __slots__ = ()
+
     def __init__(self, *content):
         super().__init__("div")
         self.extend(content)
@@ -28,6 +30,8 @@ class Paragraph(Element):
         >>> p2.append("This is another paragraph.")
     """
 
+    __slots__ = ()
+
     def __init__(self, *content):
         super().__init__("p")
         self.extend(content)
@@ -44,5 +48,7 @@ class Preformatted(Element):
         >>> pre.append("Hello\\nWorld!")
     """
 
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("pre")
@@ -0,0 +1,471 @@
+"""Caching of rendered fragments.
+
+memoize() turns a generator class or factory function into a component
+whose rendered output is cached, keyed by its arguments. By default, the
+output is stored in a FragmentCache, an in-memory LRU cache. A
+DirectoryCache can be shared by several processes.
+
+"""
+
+import mmap
+import os
+import struct
+from collections import OrderedDict, namedtuple
+from functools import wraps
+from hashlib import sha256
+from tempfile import mkstemp
+from threading import Event, Lock
+from time import monotonic, time
+
+from htmlgen.generator import Generator, _encoded_size, _render_frozen
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "entries", "size"])
+
+
+class FragmentCache:
+    """Thread-safe in-memory cache for rendered fragments.
+
+        >>> cache = FragmentCache(max_entries=2)
+        >>> cache.set("a", "<p>A</p>")
+        >>> cache.set("b", "<p>B</p>")
+        >>> cache.get("a")
+        '<p>A</p>'
+        >>> cache.set("c", "<p>C</p>")
+        >>> cache.get("b") is None
+        True
+
+    When the cache is full, the least recently used fragments are evicted.
+    The cache is full when it contains max_entries fragments, or when the
+    UTF-8 encoded size of all fragments would exceed max_bytes. If ttl is
+    given, fragments expire ttl seconds after they were stored.
+
+    Other caches can be used with memoize(), as long as they provide the
+    get() and set() methods, as well as __len__() and a size attribute.
+
+    """
+
+    def __init__(self, max_entries=1024, max_bytes=None, ttl=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.size = 0
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self):
+        """Return the number of cached fragments."""
+        return len(self._entries)
+
+    def get(self, key):
+        """Return the fragment stored under key or None if not cached."""
+        with self._lock:
+            try:
+                html, size, expires = self._entries[key]
+            except KeyError:
+                return None
+            if expires is not None and monotonic() >= expires:
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return html
+
+    def set(self, key, html):
+        """Store a fragment under key.
+
+        Fragments larger than max_bytes are not stored.
+
+        """
+        size = _encoded_size(html)
+        expires = None if self.ttl is None else monotonic() + self.ttl
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if self.max_bytes is not None and size > self.max_bytes:
+                return
+            self._entries[key] = html, size, expires
+            self.size += size
+            while len(self._entries) > self.max_entries or (
+                self.max_bytes is not None and self.size > self.max_bytes
+            ):
+                self._remove(next(iter(self._entries)))
+
+    def clear(self):
+        """Remove all fragments."""
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def _remove(self, key):
+        _, size, _ = self._entries.pop(key)
+        self.size -= size
+
+
+# Header of DirectoryCache files, containing the expiry timestamp or 0.
+_HEADER = struct.Struct(">d")
+_SUFFIX = ".html"
+_TEMP_SUFFIX = ".tmp"
+# Temporary files older than this are left over from crashed writers.
+_STALE_TEMP_AGE = 600.0
+
+
+class DirectoryCache:
+    """Cache for rendered fragments that is shared between processes.
+
+        >>> import tempfile
+        >>> with tempfile.TemporaryDirectory() as path:
+        ...     cache = DirectoryCache(path)
+        ...     cache.set("a", "<p>Ä</p>")
+        ...     DirectoryCache(path).get("a")
+        b'<p>\\xc3\\x84</p>'
+
+    Each fragment is stored UTF-8 encoded in a file in the directory path,
+    which is created if necessary. Files are read using memory mapping and
+    returned as byte strings, which are passed to the output unchanged.
+    Files are replaced atomically, so that all processes on a host can
+    use the same directory.
+
+    Like FragmentCache, the least recently used fragments are evicted if
+    the cache contains more than max_entries fragments or max_bytes bytes.
+    The modification time of a file is updated when it is read. If ttl is
+    given, fragments expire ttl seconds after they were stored.
+
+    To keep writes fast, each instance tracks the files it knows about
+    and only scans the directory after every max_entries / 10 writes.
+    Fragments written by other processes in the meantime are not
+    counted, so the limits can be exceeded temporarily. Temporary files
+    left over by crashed writers are removed during these scans.
+
+    The file name is derived from the repr() of the key, so keys must have
+    the same representation in all processes. Strings, numbers, and tuples
+    of these are suitable.
+
+    """
+
+    def __init__(self, path, max_entries=10000, max_bytes=None, ttl=None):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        os.makedirs(path, exist_ok=True)
+        # Maps the paths of known files to their (mtime, size), least
+        # recently used first, plus their total size. None until the first
+        # scan.
+        self._entries = None
+        self._total = 0
+        self._writes = 0
+        self._lock = Lock()
+
+    def __len__(self):
+        """Return the number of cached fragments."""
+        return len(self._scan())
+
+    @property
+    def size(self):
+        """Return the size of all cached fragments in bytes."""
+        return sum(size for _, size, _ in self._scan())
+
+    def get(self, key):
+        """Return the fragment stored under key or None if not cached."""
+        path = self._file_name(key)
+        try:
+            f = open(path, "rb")
+        except FileNotFoundError:
+            return None
+        with f:
+            try:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:  # empty file
+                return None
+            with data:
+                if len(data) < _HEADER.size:
+                    return None
+                (expires,) = _HEADER.unpack_from(data)
+                if expires and time() >= expires:
+                    _remove_file(path)
+                    return None
+                html = data[_HEADER.size :]
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return html
+
+    def set(self, key, html):
+        """Store a fragment under key.
+
+        Fragments larger than max_bytes are not stored.
+
+        """
+        if isinstance(html, str):
+            html = html.encode("utf-8")
+        if self.max_bytes is not None and len(html) > self.max_bytes:
+            return
+        expires = 0.0 if self.ttl is None else time() + self.ttl
+        path = self._file_name(key)
+        fd, temp_path = mkstemp(suffix=_TEMP_SUFFIX, dir=self.path)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(_HEADER.pack(expires))
+                f.write(html)
+            os.replace(temp_path, path)
+            mtime = os.stat(path).st_mtime
+        except BaseException:
+            _remove_file(temp_path)
+            raise
+        with self._lock:
+            self._writes += 1
+            if self._entries is None or self._writes >= max(
+                self.max_entries // 10, 1
+            ):
+                self._rescan()
+            else:
+                old = self._entries.pop(path, None)
+                if old is not None:
+                    self._total -= old[1]
+                self._entries[path] = mtime, len(html)
+                self._total += len(html)
+            self._evict()
+
+    def clear(self):
+        """Remove all fragments."""
+        for _, _, path in self._scan():
+            _remove_file(path)
+        with self._lock:
+            self._entries = None
+
+    def _file_name(self, key):
+        digest = sha256(repr(key).encode("utf-8")).hexdigest()
+        return os.path.join(self.path, digest + _SUFFIX)
+
+    def _scan(self, remove_stale=False):
+        """Return (mtime, size, path) tuples for all cache files.
+
+        If remove_stale is True, stale temporary files are removed.
+
+        """
+        entries = []
+        stale_time = time() - _STALE_TEMP_AGE
+        with os.scandir(self.path) as it:
+            for entry in it:
+                if entry.name.endswith(_SUFFIX):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    size = _fragment_size(stat)
+                    entries.append((stat.st_mtime, size, entry.path))
+                elif remove_stale and entry.name.endswith(_TEMP_SUFFIX):
+                    try:
+                        if entry.stat().st_mtime < stale_time:
+                            _remove_file(entry.path)
+                    except FileNotFoundError:
+                        pass
+        return entries
+
+    def _rescan(self):
+        entries = self._scan(remove_stale=True)
+        entries.sort()
+        self._entries = OrderedDict(
+            (path, (mtime, size)) for mtime, size, path in entries
+        )
+        self._total = sum(size for _, size, _ in entries)
+        self._writes = 0
+
+    def _evict(self):
+        entries = self._entries
+        while entries and (
+            len(entries) > self.max_entries
+            or (self.max_bytes is not None and self._total > self.max_bytes)
+        ):
+            path, (mtime, size) = entries.popitem(last=False)
+            self._total -= size
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                # Removed by another process or expired.
+                continue
+            if stat.st_mtime > mtime:
+                # Used or replaced by another process since it was
+                # recorded.
+                size = _fragment_size(stat)
+                entries[path] = stat.st_mtime, size
+                self._total += size
+                continue
+            _remove_file(path)
+
+
+def _fragment_size(stat):
+    return max(stat.st_size - _HEADER.size, 0)
+
+
+def _remove_file(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class MemoizedGenerator(Generator):
+
+    """Generator returned by memoized components.
+
+    The component is only created and rendered if its output is not
+    cached. The key attribute contains the cache key.
+
+    """
+
+    __slots__ = ("key", "_memo", "_args", "_kwargs")
+
+    def __init__(self, memo, key, args, kwargs):
+        super(MemoizedGenerator, self).__init__()
+        self.key = key
+        self._memo = memo
+        self._args = args
+        self._kwargs = kwargs
+
+    def generate(self):
+        yield self._memo.render(self)
+
+    def _create(self):
+        return self._memo.function(*self._args, **self._kwargs)
+
+
+class _Flight:
+    def __init__(self):
+        self.done = Event()
+        self.html = None
+
+
+class _Memo:
+    def __init__(self, function, cache, key):
+        self.function = function
+        self.cache = cache
+        self.key = key
+        self.name = function.__module__ + "." + function.__qualname__
+        self.hits = 0
+        self.misses = 0
+        self._flights = {}
+        self._lock = Lock()
+
+    def __call__(self, *args, **kwargs):
+        if self.key is None:
+            key = args, tuple(sorted(kwargs.items()))
+        else:
+            key = self.key(*args, **kwargs)
+        return MemoizedGenerator(self, (self.name, key), args, kwargs)
+
+    def render(self, generator):
+        key = generator.key
+        html = self.cache.get(key)
+        with self._lock:
+            if html is not None:
+                self.hits += 1
+                return html
+            flight = self._flights.get(key)
+            if flight is None:
+                flight = self._flights[key] = _Flight()
+                self.misses += 1
+                leader = True
+            else:
+                leader = False
+        if not leader:
+            # Another thread is rendering the same fragment.
+            flight.done.wait()
+            if flight.html is not None:
+                with self._lock:
+                    self.hits += 1
+                return flight.html
+            return _render_frozen(generator._create())
+        try:
+            html = _render_frozen(generator._create())
+            self.cache.set(key, html)
+            flight.html = html
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        return html
+
+    def cache_info(self):
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        return CacheInfo(hits, misses, len(self.cache), self.cache.size)
+
+    def cache_clear(self):
+        self.cache.clear()
+        with self._lock:
+            self.hits = self.misses = 0
+
+
+def memoize(
+    function=None,
+    *,
+    cache=None,
+    max_entries=1024,
+    max_bytes=None,
+    ttl=None,
+    key=None
+):
+    """Cache the rendered output of a component, keyed by its arguments.
+
+    memoize() can decorate generator classes and functions returning
+    generators:
+
+        >>> from htmlgen import Division
+        >>> @memoize(max_entries=100, ttl=60)
+        ... def product_card(product_id, locale):
+        ...     print("creating card", product_id)
+        ...     return Division("Product ", str(product_id))
+        >>> str(product_card(42, "en"))
+        creating card 42
+        '<div>Product 42</div>'
+        >>> str(product_card(42, "en"))
+        '<div>Product 42</div>'
+        >>> product_card.cache_info()
+        CacheInfo(hits=1, misses=1, entries=1, size=21)
+
+    Calling the decorated component returns a MemoizedGenerator. The
+    component is only called when the generator is rendered and its
+    output is not cached. A decorated class can therefore no longer be
+    used with isinstance() or as base class. The original component is
+    available as the __wrapped__ attribute.
+
+    By default, the cache key consists of all positional and keyword
+    arguments, which must be hashable. A custom key can be calculated by
+    passing a function as key, which is called with the same arguments as
+    the component.
+
+    The output is stored in cache. By default, a new FragmentCache is
+    created, using max_entries, max_bytes, and ttl. A cache can be shared
+    by several components. To share cached output between processes, use
+    a DirectoryCache. If multiple threads render the same uncached
+    component at the same time, only one thread renders it, while the
+    other threads wait for the result.
+
+    The decorated component has a cache_info() method that returns the
+    number of cache hits and misses, as well as the number of entries and
+    the size of the cache in bytes. cache_clear() clears the cache and
+    resets the statistics.
+
+    Components can not contain htmlgen.Deferred elements or asynchronous
+    generators.
+
+    """
+    if cache is None:
+        cache = FragmentCache(max_entries, max_bytes, ttl)
+
+    def decorate(function):
+        memo = _Memo(function, cache, key)
+
+        @wraps(function)
+        def create(*args, **kwargs):
+            return memo(*args, **kwargs)
+
+        create.cache = cache
+        create.cache_info = memo.cache_info
+        create.cache_clear = memo.cache_clear
+        return create
+
+    if function is not None:
+        return decorate(function)
+    return decorate
@@ -0,0 +1,83 @@
+from typing import (
+    Any,
+    Callable,
+    Hashable,
+    NamedTuple,
+    Optional,
+    Protocol,
+    Union,
+    overload,
+)
+
+from htmlgen.generator import Generator
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    entries: int
+    size: int
+
+class _Cache(Protocol):
+    @property
+    def size(self) -> int: ...
+    def __len__(self) -> int: ...
+    def get(self, key: Hashable) -> Union[str, bytes, None]: ...
+    def set(self, key: Hashable, html: str) -> None: ...
+    def clear(self) -> None: ...
+
+class FragmentCache:
+    max_entries: int
+    max_bytes: Optional[int]
+    ttl: Optional[float]
+    size: int
+    def __init__(
+        self,
+        max_entries: int = ...,
+        max_bytes: Optional[int] = ...,
+        ttl: Optional[float] = ...,
+    ) -> None: ...
+    def __len__(self) -> int: ...
+    def get(self, key: Hashable) -> Optional[str]: ...
+    def set(self, key: Hashable, html: str) -> None: ...
+    def clear(self) -> None: ...
+
+class DirectoryCache:
+    path: str
+    max_entries: int
+    max_bytes: Optional[int]
+    ttl: Optional[float]
+    def __init__(
+        self,
+        path: str,
+        max_entries: int = ...,
+        max_bytes: Optional[int] = ...,
+        ttl: Optional[float] = ...,
+    ) -> None: ...
+    def __len__(self) -> int: ...
+    @property
+    def size(self) -> int: ...
+    def get(self, key: Hashable) -> Optional[bytes]: ...
+    def set(self, key: Hashable, html: Union[str, bytes]) -> None: ...
+    def clear(self) -> None: ...
+
+class MemoizedGenerator(Generator):
+    key: Hashable
+
+class _MemoizedComponent(Protocol):
+    cache: _Cache
+    __wrapped__: Callable[..., Generator]
+    def __call__(self, *args: Any, **kwargs: Any) -> MemoizedGenerator: ...
+    def cache_info(self) -> CacheInfo: ...
+    def cache_clear(self) -> None: ...
+
+@overload
+def memoize(function: Callable[..., Generator]) -> _MemoizedComponent: ...
+@overload
+def memoize(
+    *,
+    cache: Optional[_Cache] = ...,
+    max_entries: int = ...,
+    max_bytes: Optional[int] = ...,
+    ttl: Optional[float] = ...,
+    key: Optional[Callable[..., Hashable]] = ...,
+) -> Callable[[Callable[..., Generator]], _MemoizedComponent]: ...
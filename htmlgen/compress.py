@@ -0,0 +1,94 @@
+"""Compression of rendered output.
+
+CompressedOutput compresses the output of a generator while it is being
+rendered, so that compressed responses can be sent without buffering the
+whole page.
+
+"""
+
+import zlib
+
+# zlib window sizes for the supported HTTP content codings.
+_WBITS = {"gzip": 16 + zlib.MAX_WBITS, "deflate": zlib.MAX_WBITS}
+
+# Chunk size used if compressed data is only flushed at the end.
+_UNFLUSHED_CHUNK_SIZE = 65536
+
+
+class CompressedOutput:
+    """Iterable over the compressed output of a generator.
+
+        >>> import gzip
+        >>> from htmlgen import Division
+        >>> output = CompressedOutput(Division("Test"))
+        >>> output.content_encoding
+        'gzip'
+        >>> gzip.decompress(b"".join(output))
+        b'<div>Test</div>'
+
+    encoding is either "gzip" or "deflate", matching the HTTP content
+    codings of the same names. level is the zlib compression level.
+
+    Each iteration renders the generator anew. Compressed data is flushed
+    whenever at least flush_size bytes of uncompressed output have been
+    generated, so that the client can start processing the page early.
+    If max_delay is given, compressed data is also flushed when rendering
+    has not produced any output for max_delay seconds. Each flush slightly
+    worsens compression. If flush_size is None, only complete compressed
+    blocks are returned, which gives the best compression.
+
+    CompressedOutput can be returned from a WSGI application:
+
+        >>> def application(env, start_response):
+        ...     start_response(
+        ...         "200 OK",
+        ...         [
+        ...             ("Content-Type", "text/html; charset=utf-8"),
+        ...             ("Content-Encoding", "gzip"),
+        ...         ],
+        ...     )
+        ...     return CompressedOutput(Division("Test"))
+
+    """
+
+    def __init__(
+        self,
+        generator,
+        encoding="gzip",
+        level=6,
+        flush_size=16384,
+        max_delay=None,
+        budget=None,
+    ):
+        if encoding not in _WBITS:
+            raise ValueError("unsupported encoding '{}'".format(encoding))
+        if flush_size is None and max_delay is not None:
+            raise ValueError("max_delay requires a flush_size")
+        self.generator = generator
+        self.content_encoding = encoding
+        self.level = level
+        self.flush_size = flush_size
+        self.max_delay = max_delay
+        self.budget = budget
+
+    def __iter__(self):
+        compressor = zlib.compressobj(
+            self.level, zlib.DEFLATED, _WBITS[self.content_encoding]
+        )
+        if self.flush_size is None:
+            chunks = self.generator.iter_chunks(
+                _UNFLUSHED_CHUNK_SIZE, budget=self.budget
+            )
+            for chunk in chunks:
+                compressed = compressor.compress(chunk)
+                if compressed:
+                    yield compressed
+        else:
+            chunks = self.generator.iter_chunks(
+                self.flush_size, self.max_delay, self.budget
+            )
+            for chunk in chunks:
+                yield compressor.compress(chunk) + compressor.flush(
+                    zlib.Z_SYNC_FLUSH
+                )
+        yield compressor.flush()
@@ -0,0 +1,21 @@
+from typing import Iterator, Optional
+
+from htmlgen.generator import Generator, RenderBudget
+
+class CompressedOutput:
+    generator: Generator
+    content_encoding: str
+    level: int
+    flush_size: Optional[int]
+    max_delay: Optional[float]
+    budget: Optional[RenderBudget]
+    def __init__(
+        self,
+        generator: Generator,
+        encoding: str = ...,
+        level: int = ...,
+        flush_size: Optional[int] = ...,
+        max_delay: Optional[float] = ...,
+        budget: Optional[RenderBudget] = ...,
+    ) -> None: ...
+    def __iter__(self) -> Iterator[bytes]: ...
@@ -0,0 +1,52 @@
+from htmlgen.element import Element
+from htmlgen.generator import generate_html_string, _DEFERRED_ATTRIBUTE
+
+
+class Deferred(Element):
+    """Render a slow sub-tree after the rest of the document.
+
+    At first, only the placeholder children of a Deferred element are
+    rendered. The deferred content is rendered at the end of the document
+    body, after everything else has been sent to the client, and replaces
+    the placeholder with a small inline script:
+
+        >>> from htmlgen import Division, Document
+        >>> doc = Document()
+        >>> doc.append_body(Deferred(Division("Slow"), "Loading..."))
+        >>> doc.append_body(Division("Fast"))
+        >>> print(str(doc))  # doctest: +ELLIPSIS
+        <!DOCTYPE html>...<body><div data-htmlgen-deferred="0">Loading...</div><div>Fast</div><template data-htmlgen-deferred="0"><div>Slow</div></template><script>...</script></body></html>
+
+    The placeholder is wrapped in a <div> element by default. A different
+    element can be chosen with the element_name argument:
+
+        >>> str(Deferred("Slow", "Loading...", element_name="span"))
+        ... # doctest: +ELLIPSIS
+        '<span data-htmlgen-deferred="0">Loading...</span><template...'
+
+    Outside of a Body element or a DeferredOutlet, deferred content is
+    rendered at the end of the output. Scripts in the deferred content
+    are not executed by the browser.
+
+    """
+
+    __slots__ = ("content",)
+
+    def __init__(self, content, *placeholder, element_name="div"):
+        super().__init__(element_name)
+        self.content = generate_html_string(content)
+        self.extend(placeholder)
+
+    def _generate_in_context(self, context):
+        key = context.defer(self.content)
+        yield (
+            self.render_start_tag()
+            + " "
+            + _DEFERRED_ATTRIBUTE
+            + '="'
+            + key
+            + '">'
+        )
+        if self._children is not None:
+            yield self._children
+        yield "</" + self.element_name + ">"
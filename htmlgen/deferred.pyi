@@ -0,0 +1,11 @@
+from htmlgen.element import Element
+from htmlgen.generator import Generator, GenValue
+
+class Deferred(Element):
+    content: Generator
+    def __init__(
+        self,
+        content: GenValue,
+        *placeholder: GenValue,
+        element_name: str = ...,
+    ) -> None: ...
@@ -1,5 +1,5 @@
 from htmlgen.attribute import html_attribute
-from htmlgen.generator import Generator
+from htmlgen.generator import Generator, DeferredOutlet
 from htmlgen.element import Element, NonVoidElement, VoidElement
 
 
@@ -35,6 +35,8 @@ class Document(Generator):
         >>> doc.append_body(Element("div"))
     """
 
+    __slots__ = ("root",)
+
     def __init__(self, title=None, language="en"):
         super().__init__()
         self.root = HTMLRoot(title=title, language=language)
@@ -84,17 +86,37 @@ class HTMLRoot(NonVoidElement):
         >>> root.body = Body()
     """
 
+    __slots__ = ("_head", "_body")
+
     def __init__(self, title="", language="en"):
         super().__init__("html")
-        self.head = Head(title=title)
-        self.body = Body()
+        self._head = Head(title=title)
+        self._body = Body()
         self.set_attribute("xmlns", "http://www.w3.org/1999/xhtml")
         self.set_attribute("lang", language)
         self.set_attribute("xml:lang", language)
 
+    @property
+    def head(self):
+        return self._head
+
+    @head.setter
+    def head(self, head):
+        self._head = head
+        self._changed()
+
+    @property
+    def body(self):
+        return self._body
+
+    @body.setter
+    def body(self, body):
+        self._body = body
+        self._changed()
+
     def generate_children(self):
-        yield self.head
-        yield self.body
+        yield self._head
+        yield self._body
 
 
 class Head(Element):
@@ -113,6 +135,8 @@ class Head(Element):
         >>> head.add_script("script.js")
     """
 
+    __slots__ = ("_title",)
+
     def __init__(self, title=None):
         super().__init__("head")
         self._title = Title(title)
@@ -145,27 +169,52 @@ class Head(Element):
 
 
 class Body(Element):
-    """HTML body (<body>) element."""
+    """HTML body (<body>) element.
+
+    Sub-trees deferred using Deferred elements are rendered at the end of
+    the body.
+
+    """
+
+    __slots__ = ()
 
     def __init__(self):
         super().__init__("body")
 
+    def generate_children(self):
+        if self._children is not None:
+            yield self._children
+        yield DeferredOutlet()
+
 
 class Title(NonVoidElement):
     """HTML page title (<title>) element."""
 
+    __slots__ = ("_title",)
+
     def __init__(self, title=None):
         super().__init__("title")
-        self.title = title or ""
+        self._title = title or ""
+
+    @property
+    def title(self):
+        return self._title
+
+    @title.setter
+    def title(self, title):
+        self._title = title
+        self._changed()
 
     def generate_children(self):
-        if self.title:
-            yield self.title
+        if self._title:
+            yield self._title
 
 
 class Meta(VoidElement):
     """HTML meta information (<meta>) element."""
 
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("meta")
 
@@ -202,19 +251,30 @@ class Script(NonVoidElement):
         'text/javascript'
     """
 
+    __slots__ = ("_script",)
+
     def __init__(self, url=None, script=None):
         assert url is None or script is None
         super().__init__("script")
         if url:
             self.url = url
-        self.script = script
+        self._script = script
+
+    @property
+    def script(self):
+        return self._script
+
+    @script.setter
+    def script(self, script):
+        self._script = script
+        self._changed()
 
     type = html_attribute("type", default=MIME_JAVASCRIPT)
     url = html_attribute("src")
 
     def generate_children(self):
-        if self.script:
-            yield self.script
+        if self._script:
+            yield self._script
 
 
 def json_script(json):
@@ -240,6 +300,8 @@ def json_script(json):
 class HeadLink(VoidElement):
     """HTML meta data link (<link>) element."""
 
+    __slots__ = ()
+
     def __init__(self, relation, url):
         super().__init__("link")
         self.relation = relation
@@ -256,5 +318,7 @@ class HeadLink(VoidElement):
 class Main(Element):
     """HTML main document content (<main>) element."""
 
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("main")
@@ -1,6 +1,11 @@
 from html import escape
 
-from htmlgen.generator import Generator, HTMLChildGenerator
+from htmlgen.generator import (
+    Generator,
+    HTMLChildGenerator,
+    _Observable,
+    _DIRTY,
+)
 
 
 def is_element(o, element_name):
@@ -12,18 +17,88 @@ def is_element(o, element_name):
     )
 
 
-class ElementBase(Generator):
+class ElementBase(Generator, _Observable):
+
+    """Base class for HTML elements.
+
+    The output of an element can be cached by calling
+    enable_render_cache(). This is useful for large, long-lived trees that
+    are rendered repeatedly, but only change in small parts between
+    renders. The cache is invalidated automatically when the element or an
+    element in its sub-tree is changed using the element API, for example
+    with set_attribute() or append():
+
+        >>> element = Element("div")
+        >>> element.enable_render_cache()
+        >>> child = Element("span")
+        >>> element.append(child)
+        >>> str(element)
+        '<div><span></span></div>'
+        >>> child.set_attribute("title", "Test")
+        >>> str(element)
+        '<div><span title="Test"></span></div>'
+
+    When only a part of the tree has changed, elements with a valid cache
+    are not rendered again. Changes that do not go through the element
+    API are not tracked. This includes changes to other generators, like
+    IteratorGenerator, and to state that a sub-class uses in an overridden
+    generate_children() method. Call invalidate_render_cache() after such
+    changes. The stock elements do this for their own state, for example
+    when Title.title is set. Elements that override generate() are never
+    cached. Cached elements can not contain asynchronous generators or
+    htmlgen.Deferred elements.
+
+    """
+
+    __slots__ = (
+        "element_name",
+        "_attributes",
+        "_css_classes",
+        "_styles",
+        "_render_cache",
+    )
+
     def __init__(self, element_name):
         super().__init__()
         self.element_name = element_name
-        self._attributes = {}
-        self._css_classes = set()
-        self._styles = {}
-        self._data = _ElementDataProxy(self)
+        self._render_cache = None
+        # Containers are allocated on first write, since most elements
+        # do not use all of them.
+        self._attributes = None
+        self._css_classes = None
+        self._styles = None
 
     def generate(self):
         raise NotImplementedError()
 
+    def enable_render_cache(self):
+        """Cache the output of this element between renders."""
+        if self._render_cache is None:
+            self._render_cache = _DIRTY
+
+    def disable_render_cache(self):
+        """Stop caching the output of this element and discard the cache."""
+        self._render_cache = None
+
+    @property
+    def render_cache_enabled(self):
+        """Return whether the output of this element is cached."""
+        return self._render_cache is not None
+
+    def invalidate_render_cache(self):
+        """Discard the cached output of this element and its ancestors.
+
+        This is done automatically when the element is changed using the
+        element API.
+
+        """
+        self._changed()
+
+    def _changed(self):
+        if self._render_cache is not None:
+            self._render_cache = _DIRTY
+        super()._changed()
+
     @property
     def data(self):
         """Dictionary-like object for setting data-* attributes.
@@ -42,12 +117,17 @@ class ElementBase(Generator):
             '<div data-abc="xyz" data-foo="bar"></div>'
 
         """
-        return self._data
+        # The proxy is not stored, since it would form a reference cycle
+        # with the element, which only the cyclic garbage collector can
+        # free.
+        return _ElementDataProxy(self)
 
     @data.setter
     def data(self, data):
-        self._data.clear()
-        self._data = _ElementDataProxy.from_data(self, data)
+        proxy = _ElementDataProxy(self)
+        proxy.clear()
+        for key, value in data.items():
+            proxy[key] = value
 
     def set_attribute(self, name, value):
         """Set an HTML attribute to a given string value.
@@ -64,7 +144,10 @@ class ElementBase(Generator):
         """
         if not isinstance(name, str) or not isinstance(value, str):
             raise TypeError("name and value must be strings")
+        if self._attributes is None:
+            self._attributes = {}
         self._attributes[name] = value
+        self._changed()
 
     def get_attribute(self, name, default=None):
         """Return the value of an HTML attribute.
@@ -72,6 +155,8 @@ class ElementBase(Generator):
         If the attribute is not set, return the default value.
 
         """
+        if self._attributes is None:
+            return default
         return self._attributes.get(name, default)
 
     def remove_attribute(self, name):
@@ -80,14 +165,20 @@ class ElementBase(Generator):
         If the attribute is not set, do nothing.
 
         """
+        if self._attributes is None:
+            return
         try:
             del self._attributes[name]
         except KeyError:
             pass
+        else:
+            self._changed()
 
     @property
     def attribute_names(self):
         """Return a set of all attribute names of this element."""
+        if self._attributes is None:
+            return set()
         return set(self._attributes.keys())
 
     def add_css_classes(self, *css_classes):
@@ -99,8 +190,11 @@ class ElementBase(Generator):
             '<div class="my-css"></div>'
 
         """
+        if self._css_classes is None:
+            self._css_classes = set()
         for cls in css_classes:
             self._css_classes.add(cls)
+        self._changed()
 
     def remove_css_classes(self, *css_classes):
         """Remove CSS classes from this element.
@@ -108,15 +202,16 @@ class ElementBase(Generator):
         Unknown classes are ignored.
 
         """
-        for cls in css_classes:
-            try:
-                self._css_classes.remove(cls)
-            except KeyError:
-                pass
+        if self._css_classes is None:
+            return
+        count = len(self._css_classes)
+        self._css_classes.difference_update(css_classes)
+        if len(self._css_classes) != count:
+            self._changed()
 
     def has_css_class(self, css_class):
         """Return whether this element has a CSS class."""
-        return css_class in self._css_classes
+        return self._css_classes is not None and css_class in self._css_classes
 
     def set_style(self, name, value):
         """Set a CSS style on this element.
@@ -127,7 +222,10 @@ class ElementBase(Generator):
             '<div style="background-color: green"></div>'
 
         """
+        if self._styles is None:
+            self._styles = {}
         self._styles[name] = value
+        self._changed()
 
     @property
     def id(self):
@@ -144,8 +242,9 @@ class ElementBase(Generator):
 
     def render_start_tag(self):
         html = "<" + self.element_name
-        for attribute, value in sorted(self._attributes.items()):
-            html += self._get_attribute_string(attribute, value)
+        if self._attributes:
+            for attribute, value in sorted(self._attributes.items()):
+                html += self._get_attribute_string(attribute, value)
         if self._css_classes:
             html += self._get_attribute_string("class", self._class_value)
         if self._styles:
@@ -177,6 +276,8 @@ class _ElementDataProxy:
 
     """
 
+    __slots__ = ("_element",)
+
     def __init__(self, element):
         self._element = element
 
@@ -233,6 +334,8 @@ class NonVoidElement(ElementBase):
 
     """
 
+    __slots__ = ()
+
     def generate(self):
         yield self.render_start_tag() + ">"
         for element in self.generate_children():
@@ -294,34 +397,131 @@ class Element(NonVoidElement):
 
     """
 
+    __slots__ = ("_children",)
+
     def __init__(self, element_name):
         super().__init__(element_name)
-        self.children = HTMLChildGenerator()
+        self._children = None
+
+    @property
+    def children(self):
+        """Return the HTMLChildGenerator holding the children.
+
+        It is created when it is first accessed.
+
+        """
+        if self._children is None:
+            self._children = HTMLChildGenerator()
+            # Render caches that were recorded without children do not
+            # observe the new child generator.
+            self._changed()
+        return self._children
+
+    @children.setter
+    def children(self, children):
+        self._children = children
+        self._changed()
 
     def __bool__(self):
         return True
 
-    def __getattr__(self, item):
-        return getattr(self.children, item)
-
     def __len__(self):
         """Return the number of children.
 
         A sub-generator is counted as one child.
 
         """
-        return len(self.children)
+        if self._children is None:
+            return 0
+        return len(self._children)
 
     def __nonzero__(self):
         return True
 
+    def append(self, child):
+        """Append a string or sub generator.
+
+        Strings are escaped to be HTML-safe.
+
+        """
+        self.children.append(child)
+
+    def append_raw(self, child):
+        """Append a string or sub generator without escaping it.
+
+        Strings are NOT escaped! Therefore, you should use this method only
+        with HTML from trusted sources.
+
+        """
+        self.children.append_raw(child)
+
+    def extend(self, children):
+        """Append multiple strings and sub generators.
+
+        Strings are escaped to be HTML-safe.
+
+        """
+        if self._children is None:
+            children = list(children)
+            if not children:
+                return
+        self.children.extend(children)
+
+    def extend_raw(self, children):
+        """Append multiple strings and sub generators, without escaping them.
+
+        Strings are NOT escaped! Therefore, you should use this method only
+        with HTML from trusted sources.
+
+        """
+        if self._children is None:
+            children = list(children)
+            if not children:
+                return
+        self.children.extend_raw(children)
+
+    def remove(self, child):
+        """Remove a string or sub-generator.
+
+        If child is a string, it will be HTML-escaped before trying to
+        remove it. Use this method for strings added with append() or
+        extend().
+
+        If the string or sub-generator is not found, raises a ValueError.
+
+        """
+        if self._children is None:
+            raise ValueError("child not found")
+        self._children.remove(child)
+
+    def remove_raw(self, child):
+        """Remove a string or sub-generator.
+
+        If child is a string, it will not be HTML-escaped before trying to
+        remove it. Use this method for strings added with append_raw() or
+        extend_raw().
+
+        If the string or sub-generator is not found, raises a ValueError.
+
+        """
+        if self._children is None:
+            raise ValueError("child not found")
+        self._children.remove_raw(child)
+
+    def empty(self):
+        """Remove all children."""
+        if self._children is not None:
+            self._children.empty()
+
     def generate_children(self):
         """Return an iterator over the children of this element.
 
         This method can be overridden by sub-classes.
 
         """
-        return self.children
+        if self._children is None:
+            return iter([])
+        return self._children
 
 
 class VoidElement(ElementBase):
@@ -337,5 +537,7 @@ class VoidElement(ElementBase):
 
     """
 
+    __slots__ = ()
+
     def generate(self):
         yield self.render_start_tag() + "/>"
@@ -1,8 +1,17 @@
 from collections.abc import Sized
 import typing
-from typing import Any, Mapping, Union, TypeVar, Set, Optional, overload
+from typing import (
+    Any,
+    Iterable,
+    Mapping,
+    Union,
+    TypeVar,
+    Set,
+    Optional,
+    overload,
+)
 
-from htmlgen.generator import Generator, HTMLChildGenerator
+from htmlgen.generator import GenValue, Generator, HTMLChildGenerator
 
 _T = TypeVar("_T")
 
@@ -42,18 +51,32 @@ class ElementBase(Generator):
     def has_css_class(self, css_class: str) -> bool: ...
     def set_style(self, name: str, value: str) -> None: ...
     def render_start_tag(self) -> str: ...
+    def enable_render_cache(self) -> None: ...
+    def disable_render_cache(self) -> None: ...
+    @property
+    def render_cache_enabled(self) -> bool: ...
+    def invalidate_render_cache(self) -> None: ...
 
 class NonVoidElement(ElementBase):
     def generate_children(
-        self
-    ) -> typing.Generator[Union[str, bytes, Generator], None, None]: ...
+        self,
+    ) -> Union[
+        typing.Generator[Union[str, bytes, Generator], None, None],
+        typing.AsyncGenerator[Union[str, bytes, Generator], None],
+    ]: ...
 
 class Element(NonVoidElement, Sized):
     children: HTMLChildGenerator
     def __init__(self, element_name: str) -> None: ...
     def __bool__(self) -> bool: ...
-    def __getattr__(self, item: str) -> Any: ...
     def __len__(self) -> int: ...
     def __nonzero__(self) -> bool: ...
+    def append(self, child: Optional[GenValue]) -> None: ...
+    def append_raw(self, child: GenValue) -> None: ...
+    def extend(self, children: Iterable[GenValue]) -> None: ...
+    def extend_raw(self, children: Iterable[GenValue]) -> None: ...
+    def remove(self, child: GenValue) -> None: ...
+    def remove_raw(self, child: GenValue) -> None: ...
+    def empty(self) -> None: ...
 
 class VoidElement(ElementBase): ...
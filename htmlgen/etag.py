@@ -0,0 +1,119 @@
+"""Content hashes of rendered output.
+
+HashedOutput calculates a hash of the output of a generator while it is
+being rendered. The hash can be used as an HTTP entity tag (ETag).
+
+"""
+
+import hashlib
+
+
+class HashedOutput:
+    """Iterable over the output of a generator that hashes the output.
+
+        >>> from htmlgen import Division
+        >>> output = HashedOutput(Division("Test"))
+        >>> b"".join(output)
+        b'<div>Test</div>'
+        >>> output.hexdigest()
+        '76c792047689e2c875aa2947659c01473db0e72299bda34851af653fe98fcfc4'
+        >>> output.etag
+        '"76c792047689e2c875aa2947659c01473db0e72299bda34851af653fe98fcfc4"'
+
+    The output is returned in UTF-8 encoded chunks of at least min_size
+    bytes, like with Generator.iter_chunks(). algorithm is the name of a
+    hash algorithm supported by hashlib.
+
+    The hash is only available after the output has been iterated over
+    completely. Each iteration renders the generator anew and resets the
+    hash. The hash only depends on the output, not on how it is split into
+    chunks. A page whose output does not change keeps its entity tag, so
+    a stored entity tag can be compared against an If-None-Match request
+    header using etag_matches() before rendering the page again.
+
+    """
+
+    def __init__(
+        self, generator, algorithm="sha256", min_size=8192, budget=None
+    ):
+        hashlib.new(algorithm)  # raise ValueError for unknown algorithms
+        self.generator = generator
+        self.algorithm = algorithm
+        self.min_size = min_size
+        self.budget = budget
+        self._hash = None
+
+    def __iter__(self):
+        self._hash = None
+        hash_ = hashlib.new(self.algorithm)
+        for chunk in self.generator.iter_chunks(
+            self.min_size, budget=self.budget
+        ):
+            hash_.update(chunk)
+            yield chunk
+        self._hash = hash_
+
+    @property
+    def complete(self):
+        """Return whether the hash is available."""
+        return self._hash is not None
+
+    def digest(self):
+        """Return the hash of the output as a byte string.
+
+        Raise a ValueError if the output has not been iterated over
+        completely.
+
+        """
+        return self._get_hash().digest()
+
+    def hexdigest(self):
+        """Return the hash of the output as a hexadecimal string.
+
+        Raise a ValueError if the output has not been iterated over
+        completely.
+
+        """
+        return self._get_hash().hexdigest()
+
+    @property
+    def etag(self):
+        """Return a strong HTTP entity tag for the output.
+
+        Raise a ValueError if the output has not been iterated over
+        completely.
+
+        """
+        return '"' + self.hexdigest() + '"'
+
+    def _get_hash(self):
+        if self._hash is None:
+            raise ValueError("output has not been rendered completely")
+        return self._hash
+
+
+def etag_matches(if_none_match, etag):
+    """Return whether an If-None-Match header value matches an entity tag.
+
+        >>> etag_matches('"abc", W/"def"', '"def"')
+        True
+        >>> etag_matches('"abc"', '"def"')
+        False
+        >>> etag_matches("*", '"def"')
+        True
+
+    Entity tags are compared using the weak comparison as required for
+    If-None-Match.
+
+    """
+    if if_none_match.strip() == "*":
+        return True
+    etag = _strip_weak(etag.strip())
+    for tag in if_none_match.split(","):
+        if _strip_weak(tag.strip()) == etag:
+            return True
+    return False
+
+
+def _strip_weak(tag):
+    return tag[2:] if tag.startswith("W/") else tag
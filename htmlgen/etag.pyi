@@ -0,0 +1,25 @@
+from typing import Iterator, Optional
+
+from htmlgen.generator import Generator, RenderBudget
+
+class HashedOutput:
+    generator: Generator
+    algorithm: str
+    min_size: int
+    budget: Optional[RenderBudget]
+    def __init__(
+        self,
+        generator: Generator,
+        algorithm: str = ...,
+        min_size: int = ...,
+        budget: Optional[RenderBudget] = ...,
+    ) -> None: ...
+    def __iter__(self) -> Iterator[bytes]: ...
+    @property
+    def complete(self) -> bool: ...
+    def digest(self) -> bytes: ...
+    def hexdigest(self) -> str: ...
+    @property
+    def etag(self) -> str: ...
+
+def etag_matches(if_none_match: str, etag: str) -> bool: ...
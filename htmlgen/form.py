@@ -39,6 +39,8 @@ class Form(Element):
 
     """
 
+    __slots__ = ()
+
     def __init__(self, method="GET", url=""):
         super().__init__("form")
         self.method = method
@@ -76,6 +78,8 @@ class Input(VoidElement):
 
     """
 
+    __slots__ = ()
+
     def __init__(self, type_="text", name=""):
         """Create an HTML input element.
 
@@ -112,6 +116,8 @@ class TextInput(Input):
 
     """
 
+    __slots__ = ()
+
     def __init__(self, name="", value=""):
         """Create an HTML text input element.
 
@@ -128,6 +134,8 @@ class TextInput(Input):
 class SearchInput(Input):
     """An HTML search (<input type="search">) element."""
 
+    __slots__ = ()
+
     def __init__(self, name=""):
         """Create an HTML search element.
 
@@ -141,6 +149,8 @@ class SearchInput(Input):
 class PasswordInput(Input):
     """An HTML password input (<input type="password">) element."""
 
+    __slots__ = ()
+
     def __init__(self, name=""):
         """Create an HTML password input element.
 
@@ -154,6 +164,8 @@ class PasswordInput(Input):
 class NumberInput(Input):
     """An HTML number input (<input type="number">) element."""
 
+    __slots__ = ()
+
     def __init__(self, name="", number=None):
         """Create an HTML number input element.
 
@@ -177,6 +189,8 @@ class NumberInput(Input):
 class DateInput(Input):
     """An HTML date input (<input type="date">) element."""
 
+    __slots__ = ()
+
     def __init__(self, name="", date=None):
         """Create an HTML date element.
 
@@ -218,6 +232,8 @@ class DateInput(Input):
 class TimeInput(Input):
     """An HTML time input (<input type="time">) element."""
 
+    __slots__ = ()
+
     def __init__(self, name="", time=None):
         """Create an HTML time element.
 
@@ -287,6 +303,8 @@ class TimeInput(Input):
 
 
 class _CheckableInput(Input):
+    __slots__ = ()
+
     def __init__(self, type_, name, value):
         super().__init__(type_, name)
         if value:
@@ -303,6 +321,8 @@ class Checkbox(_CheckableInput):
 
     """
 
+    __slots__ = ()
+
     def __init__(self, name="", value=""):
         super().__init__("checkbox", name, value)
 
@@ -315,6 +335,8 @@ class RadioButton(_CheckableInput):
 
     """
 
+    __slots__ = ()
+
     def __init__(self, name="", value=""):
         super().__init__("radio", name, value)
 
@@ -322,6 +344,8 @@ class RadioButton(_CheckableInput):
 class FileInput(Input):
     """An HTML file input (<input type="file">) element."""
 
+    __slots__ = ()
+
     def __init__(self, name=""):
         super().__init__("file", name)
 
@@ -332,6 +356,8 @@ class FileInput(Input):
 class HiddenInput(Input):
     """A hidden HTML input (<input type="hidden"/>) element."""
 
+    __slots__ = ()
+
     def __init__(self, name, value):
         super().__init__("hidden", name)
         self.value = value
@@ -351,6 +377,8 @@ class SubmitButton(Input):
 
     """
 
+    __slots__ = ()
+
     def __init__(self, label):
         super().__init__("submit")
         self.value = label
@@ -371,6 +399,8 @@ class Button(Element):
 
     """
 
+    __slots__ = ()
+
     def __init__(self, *content):
         super().__init__("button")
         self.extend(content)
@@ -387,6 +417,8 @@ class TextArea(Element):
 
     """
 
+    __slots__ = ()
+
     def __init__(self, name=""):
         super().__init__("textarea")
         self.name = name
@@ -425,6 +457,8 @@ class Select(Element):
 
     """
 
+    __slots__ = ()
+
     def __init__(self, name=""):
         super().__init__("select")
         self.name = name
@@ -449,11 +483,11 @@ class Select(Element):
 
     @property
     def _options_iter(self):
-        for child in self.children.children:
+        for child in _child_list(self):
             if is_element(child, "option"):
                 yield child
             elif is_element(child, "optgroup"):
-                for sub_child in child.children.children:
+                for sub_child in _child_list(child):
                     if is_element(sub_child, "option"):
                         yield sub_child
 
@@ -511,6 +545,8 @@ class Select(Element):
 class OptionGroup(Element):
     """An HTML selection list option group (<optgroup>) element."""
 
+    __slots__ = ()
+
     def __init__(self, label):
         super().__init__("optgroup")
         self.label = label
@@ -537,6 +573,8 @@ class Option(Element):
 
     """
 
+    __slots__ = ()
+
     def __init__(self, label, value=None):
         super().__init__("option")
         self.value = value
@@ -560,7 +598,10 @@ class Option(Element):
         'Label'
 
         """
-        return self.get_attribute("value", str(self.children))
+        value = self.get_attribute("value")
+        if value is None:
+            value = str(self._children) if self._children is not None else ""
+        return value
 
     @value.setter
     def value(self, value):
@@ -578,8 +619,17 @@ class Label(Element):
 
     """
 
+    __slots__ = ()
+
     def __init__(self, *children):
         super().__init__("label")
         self.extend(children)
 
     for_ = html_attribute("for")
+
+
+def _child_list(element):
+    """Return the children of an element without allocating them."""
+    if element._children is None:
+        return []
+    return element._children.children
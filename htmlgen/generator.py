@@ -1,5 +1,12 @@
+from collections import deque
+from contextvars import ContextVar, copy_context
 from html import escape
+from inspect import isasyncgenfunction
+from queue import Queue, Empty, Full
+from threading import Event, Lock, Thread
+from time import monotonic, perf_counter
 from typing import Union, Generator as GeneratorType
+from weakref import WeakValueDictionary, ref
 
 
 class Generator:
@@ -26,48 +33,1080 @@ class Generator:
         >>> str(generator)
         'FooXXX'
 
+    render_str() and render_bytes() return the whole output at once, without
+    encoding or decoding every single item:
+
+        >>> generator.render_str()
+        'FooXXX'
+        >>> generator.render_bytes()
+        b'FooXXX'
+
+    To keep large trees small, generators and elements use __slots__.
+    Sub-classes that do not define __slots__ themselves get an instance
+    dictionary as usual, so they can set arbitrary attributes.
+
     """
 
+    __slots__ = ("__weakref__",)
+
     def __iter__(self):
         """Return a flat iterator over the elements returned by generate().
 
         __iter__() will only return UTF-8 encoded byte strings. Generators are
         flattened, Unicode strings are UTF-8 encoded.
 
+        Each call creates a new RenderContext, so a generator can be
+        iterated over multiple times at once, for example from several
+        threads.
+
+        The other rendering methods accept an optional RenderBudget that
+        limits the size of the output and the time spent rendering.
+
         """
-        self._iterator_stack = [self.generate()]
-        while self._iterator_stack:
-            iterator = self._iterator_stack[-1]
-            try:
-                item = next(iterator)
-            except StopIteration:
-                self._iterator_stack.pop()
+        for item in RenderContext(self):
+            if isinstance(item, str):
+                yield item.encode("utf-8")
             else:
-                if hasattr(item, "generate"):
-                    self._iterator_stack.append(item.generate())
-                elif isinstance(item, bytes):
-                    yield item
-                elif isinstance(item, str):
-                    yield item.encode("utf-8")
-                else:
-                    raise TypeError("can not generate {}".format(repr(item)))
+                yield item
 
     def __str__(self):
         """Return a concatenation of the strings returned by __iter__()."""
-        return "".join(s.decode("utf-8") for s in self)
+        return self.render_str()
+
+    def render_str(self, budget=None):
+        """Render this generator into a string.
+
+        Strings are collected as they are generated and joined once at the
+        end. Only byte strings generated by the tree are decoded:
+
+            >>> generator = IteratorGenerator(["Foo", b"B\\xc3\\xa4r"])
+            >>> generator.render_str()
+            'FooBär'
+
+        """
+        return "".join(
+            [
+                item if isinstance(item, str) else item.decode("utf-8")
+                for item in RenderContext(self, budget)
+            ]
+        )
+
+    def render_bytes(self, budget=None):
+        """Render this generator into a UTF-8 encoded byte string.
+
+        Consecutive strings are joined and encoded at once, byte strings
+        generated by the tree are passed through unchanged:
+
+            >>> generator = IteratorGenerator(["Foo", b"Bar", "Baz"])
+            >>> generator.render_bytes()
+            b'FooBarBaz'
+
+        """
+        chunks = []
+        strings = []
+        for item in RenderContext(self, budget):
+            if isinstance(item, str):
+                strings.append(item)
+            else:
+                if strings:
+                    chunks.append("".join(strings).encode("utf-8"))
+                    strings = []
+                chunks.append(item)
+        if strings:
+            chunks.append("".join(strings).encode("utf-8"))
+        return b"".join(chunks)
+
+    async def aiter(self, budget=None):
+        """Return an asynchronous iterator over UTF-8 encoded byte strings.
+
+        This works like __iter__(), but generate() methods in the tree can
+        also be asynchronous generators. This can be used to render parts
+        of a tree while their data is being fetched:
+
+            >>> import asyncio
+            >>> class AsyncGenerator(Generator):
+            ...     async def generate(self):
+            ...         await asyncio.sleep(0)
+            ...         yield "XXX"
+            >>> generator = IteratorGenerator(["Foo", AsyncGenerator()])
+            >>> async def collect():
+            ...     return [s async for s in generator.aiter()]
+            >>> asyncio.run(collect())
+            [b'Foo', b'XXX']
+
+        Synchronous and asynchronous generators can be mixed freely.
+        Trees that contain asynchronous generators can only be rendered
+        using aiter().
+
+        """
+        async for item in RenderContext(self, budget):
+            if isinstance(item, str):
+                yield item.encode("utf-8")
+            else:
+                yield item
+
+    def iter_chunks(self, min_size=8192, max_delay=None, budget=None):
+        """Return an iterator over UTF-8 encoded chunks of the output.
+
+        Generated items are buffered until at least min_size bytes are
+        available. This is useful for WSGI responses, where every item is
+        written to the client separately:
+
+            >>> generator = IteratorGenerator(["Foo", "Bar", "Baz", "Qux"])
+            >>> list(generator.iter_chunks(min_size=6))
+            [b'FooBar', b'BazQux']
+
+        If max_delay is given, the buffer is also flushed when items have
+        been buffered for max_delay seconds, for example because a
+        generate() method is waiting for a slow data source. In this case,
+        the tree is rendered in a background thread.
+
+        """
+        buffer = _ChunkBuffer()
+        if max_delay is None:
+            for item in RenderContext(self, budget):
+                buffer.append(item)
+                if buffer.size >= min_size:
+                    yield buffer.flush()
+        else:
+            context = RenderContext(self, budget)
+            with _BackgroundIterator(context) as items:
+                deadline = 0.0
+                while True:
+                    if buffer:
+                        timeout = max(deadline - monotonic(), 0)
+                    else:
+                        timeout = None
+                    try:
+                        item = items.next(timeout)
+                    except Empty:
+                        yield buffer.flush()
+                        continue
+                    except StopIteration:
+                        break
+                    if not buffer:
+                        deadline = monotonic() + max_delay
+                    buffer.append(item)
+                    if buffer.size >= min_size:
+                        yield buffer.flush()
+        if buffer:
+            yield buffer.flush()
+
+    def write_to(self, fileobj, batch_size=65536, budget=None):
+        """Write the output of this generator to a binary file object.
+
+        Generated items are collected into batches of about batch_size bytes
+        and written with a single call to fileobj.writelines(). Consecutive
+        strings are encoded at once, while byte strings are written as they
+        are, without copying them into an intermediate buffer:
+
+            >>> from io import BytesIO
+            >>> generator = IteratorGenerator(["Foo", b"Bar", "Baz"])
+            >>> stream = BytesIO()
+            >>> generator.write_to(stream)
+            >>> stream.getvalue()
+            b'FooBarBaz'
+
+        Any object with a writelines() method accepting byte strings can be
+        used. The htmlgen.sink module provides sinks for file descriptors and
+        sockets that use vectored I/O.
+
+        """
+        buffer = _ChunkBuffer()
+        for item in RenderContext(self, budget):
+            buffer.append(item)
+            if buffer.size >= batch_size:
+                fileobj.writelines(buffer.flush_pieces())
+        if buffer:
+            fileobj.writelines(buffer.flush_pieces())
+
+    def measure(self, budget=None):
+        """Return the length of the UTF-8 encoded output in bytes.
+
+        The tree is walked like during rendering, but the output is
+        neither encoded nor stored. This can be used to send a
+        Content-Length header before the response body:
+
+            >>> generator = IteratorGenerator(["Foo", b"B\\xc3\\xa4r", "Bär"])
+            >>> generator.measure()
+            11
+            >>> len(generator.render_bytes())
+            11
+
+        The result is only accurate if the tree generates the same output
+        each time it is rendered. For example, an IteratorGenerator is
+        exhausted by measure().
+
+        If a budget is given, the size of the output that rendering with
+        the same budget would produce is returned.
+
+        """
+        return sum(map(_encoded_size, RenderContext(self, budget)))
+
+    def freeze(self):
+        """Render this generator once and return a FrozenGenerator.
+
+        See FrozenGenerator for details.
+
+        """
+        return FrozenGenerator(self)
 
     def generate(self):
         """To be overridden by sub-classes. Return an iterator over strings,
         UTF-8-encoded bytes, and generator objects.
 
+        generate() can also be an asynchronous generator. Trees that contain
+        asynchronous generators must be rendered using aiter().
+
         """
         raise NotImplementedError()
 
 
+class RenderContext:
+
+    """State of a single rendering pass over a generator tree.
+
+    Generators do not keep any rendering state themselves. Instead, the
+    stack of nested generate() iterators lives in a RenderContext. A new
+    context is used for every rendering pass, so that a tree can be
+    rendered by several threads at the same time or while it is already
+    being rendered:
+
+        >>> class InnerGenerator(Generator):
+        ...     def generate(self):
+        ...         yield "XXX"
+        >>> class OuterGenerator(Generator):
+        ...     def generate(self):
+        ...         yield "Foo"
+        ...         yield InnerGenerator()
+        >>> list(RenderContext(OuterGenerator()))
+        ['Foo', 'XXX']
+
+    Iterating over a context returns the strings and byte strings
+    produced by the tree as they are, without encoding them. A context
+    should only be iterated over once. The asynchronous attribute is True
+    if the context is iterated over asynchronously.
+
+    If a RenderContext is created while a htmlgen.RenderProfiler is active,
+    synchronous rendering is profiled.
+
+    """
+
+    def __init__(self, root, budget=None):
+        self.root = root
+        self.budget = budget
+        self.profiler = _active_profiler.get()
+        self.asynchronous = False
+        self._deferred = deque()
+        self._deferred_count = 0
+        self._output_size = 0
+        self._node_count = 0
+        self._deadline = None
+
+    def __iter__(self):
+        stack, closers = [iter((self.root, _DEFERRED_OUTLET))], [None]
+        if self.profiler is None:
+            walk = self._walk(stack, closers, False)
+        else:
+            walk = self._walk_profiled(stack, closers)
+        if self.budget is None:
+            return walk
+        return self._limit(walk, closers)
+
+    async def __aiter__(self):
+        """Asynchronously iterate over the strings produced by the tree.
+
+        Sub-trees that contain only synchronous generators are rendered
+        like with __iter__(). Asynchronous iterators, for example returned
+        by "async def generate()", are awaited.
+
+        """
+        self.asynchronous = True
+        self._start_budget()
+        frames = [self._new_frame((self.root, _DEFERRED_OUTLET))]
+        try:
+            while frames:
+                frame = frames[-1]
+                if type(frame) is _AsyncIterator:
+                    try:
+                        item = await frame.iterator.__anext__()
+                    except StopAsyncIteration:
+                        frames.pop()
+                    else:
+                        cls = type(item)
+                        if cls is str or cls is bytes:
+                            self._count_output(item)
+                            yield item
+                        else:
+                            frames.append(self._new_frame((item,)))
+                else:
+                    for item in frame.walk:
+                        if type(item) is _AsyncIterator:
+                            frames.append(item)
+                            break
+                        self._count_output(item)
+                        yield item
+                    else:
+                        frames.pop()
+        except RenderBudgetExceeded:
+            closers = []
+            for frame in frames:
+                if type(frame) is not _AsyncIterator:
+                    closers.extend(frame.closers)
+            await _close_frames(frames)
+            if self.budget.fallback is None:
+                raise
+            for item in self._generate_fallback(closers):
+                yield item
+        finally:
+            await _close_frames(frames)
+
+    def defer(self, content):
+        """Defer rendering of a sub-tree to the next DeferredOutlet.
+
+        Return a key that identifies the deferred sub-tree during this
+        rendering pass.
+
+        """
+        key = str(self._deferred_count)
+        self._deferred_count += 1
+        self._deferred.append((key, content))
+        return key
+
+    def iter_deferred(self):
+        """Return an iterator over (key, sub-tree) tuples of deferred trees.
+
+        The sub-trees are removed from the context. Trees that are deferred
+        while iterating are included.
+
+        """
+        while self._deferred:
+            yield self._deferred.popleft()
+
+    def _new_frame(self, items):
+        frame = _WalkFrame([iter(items)], [None])
+        frame.walk = self._walk(frame.stack, frame.closers, True)
+        return frame
+
+    def _limit(self, walk, closers):
+        """Enforce the budget on the output of _walk()."""
+        self._start_budget()
+        try:
+            for item in walk:
+                self._count_output(item)
+                yield item
+        except RenderBudgetExceeded:
+            walk.close()
+            if self.budget.fallback is None:
+                raise
+            for item in self._generate_fallback(closers):
+                yield item
+
+    def _generate_fallback(self, closers):
+        fallback = generate_html_string(self.budget.fallback)
+        for item in RenderContext(fallback):
+            yield item
+        for closer in reversed(closers):
+            if closer is not None:
+                yield closer
+
+    def _start_budget(self):
+        if self.budget is not None and self.budget.max_time is not None:
+            self._deadline = monotonic() + self.budget.max_time
+
+    def _count_output(self, item):
+        budget = self.budget
+        if budget is None:
+            return
+        self._output_size += _encoded_size(item)
+        if (
+            budget.max_bytes is not None
+            and self._output_size > budget.max_bytes
+        ):
+            raise RenderBudgetExceeded(
+                "output exceeds {} bytes".format(budget.max_bytes)
+            )
+        self._check_time()
+
+    def _count_node(self):
+        budget = self.budget
+        self._node_count += 1
+        if (
+            budget.max_nodes is not None
+            and self._node_count > budget.max_nodes
+        ):
+            raise RenderBudgetExceeded(
+                "output exceeds {} nodes".format(budget.max_nodes)
+            )
+        self._check_time()
+
+    def _check_time(self):
+        if self._deadline is not None and monotonic() > self._deadline:
+            raise RenderBudgetExceeded(
+                "rendering took longer than {} seconds".format(
+                    self.budget.max_time
+                )
+            )
+
+    def _walk(self, stack, closers, allow_async, recorder=None):
+        """Return an iterator over the strings produced by a stack of items.
+
+        stack is a list of iterators over items. closers is a list of the
+        same length, containing the end tag to generate after the
+        corresponding iterator is exhausted, or None.
+
+        If allow_async is True, asynchronous iterators encountered in
+        the tree are yielded, wrapped in an _AsyncIterator. Otherwise,
+        they cause a TypeError.
+
+        recorder is the element whose output is being recorded for its
+        render cache, if any. Nodes in the tree are registered with it, so
+        that the cache is invalidated when they change.
+
+        """
+        # Stock elements and child generators are recognized by their type
+        # and rendered directly, without calling their generate() methods.
+        # Other generators, including sub-classes that override generate()
+        # or generate_children(), are rendered by calling these methods.
+        kinds = _node_kinds
+        budget = self.budget
+        push = stack.append
+        push_closer = closers.append
+        try:
+            while stack:
+                for item in stack[-1]:
+                    cls = type(item)
+                    if cls is str or cls is bytes:
+                        yield item
+                        continue
+                    if budget is not None and cls is not DeferredOutlet:
+                        self._count_node()
+                    try:
+                        kind = kinds[cls]
+                    except KeyError:
+                        kind = kinds.setdefault(cls, _classify(cls))
+                    if recorder is not None:
+                        _observe(item, kind, recorder)
+                    if (
+                        kind <= _VOID_ELEMENT
+                        and item._render_cache is not None
+                        and item is not recorder
+                    ):
+                        yield self._render_cached(item)
+                        continue
+                    if kind == _ELEMENT:
+                        yield item.render_start_tag() + ">"
+                        children = item._children
+                        if children is None:
+                            push(iter(()))
+                        elif type(children) is HTMLChildGenerator:
+                            push(iter(children._children))
+                        else:
+                            push(iter((children,)))
+                        push_closer("</" + item.element_name + ">")
+                    elif kind == _VOID_ELEMENT:
+                        yield item.render_start_tag() + "/>"
+                        continue
+                    elif kind == _FROZEN:
+                        yield item._html
+                        continue
+                    elif kind == _NON_VOID_ELEMENT:
+                        yield item.render_start_tag() + ">"
+                        push(iter(item.generate_children()))
+                        push_closer("</" + item.element_name + ">")
+                    elif kind == _CHILDREN:
+                        push(iter(item._children))
+                        push_closer(None)
+                    elif kind == _GENERATOR:
+                        iterator = item.generate()
+                        if allow_async and hasattr(iterator, "__anext__"):
+                            yield _AsyncIterator(iterator)
+                            continue
+                        push(iter(iterator))
+                        push_closer(None)
+                    elif kind == _CONTEXTUAL:
+                        iterator = item._generate_in_context(self)
+                        if allow_async and hasattr(iterator, "__anext__"):
+                            yield _AsyncIterator(iterator)
+                            continue
+                        push(iter(iterator))
+                        push_closer(None)
+                    elif kind == _ASYNC_GENERATOR:
+                        yield _async_iterator(item.generate(), allow_async)
+                        continue
+                    elif kind == _ASYNC_NON_VOID_ELEMENT:
+                        children = _async_iterator(
+                            item.generate_children(), allow_async
+                        )
+                        yield item.render_start_tag() + ">"
+                        push(iter(()))
+                        push_closer("</" + item.element_name + ">")
+                        yield children
+                    elif isinstance(item, (str, bytes)):
+                        yield item
+                        continue
+                    elif hasattr(item, "generate"):
+                        push(iter(item.generate()))
+                        push_closer(None)
+                    else:
+                        raise TypeError(
+                            "can not generate {}".format(repr(item))
+                        )
+                    break
+                else:
+                    # The end tag is removed only after it was consumed, so
+                    # that it is included in the fallback if the budget
+                    # runs out on it.
+                    closer = closers[-1]
+                    if closer is not None:
+                        yield closer
+                    stack.pop()
+                    closers.pop()
+        finally:
+            while stack:
+                close = getattr(stack.pop(), "close", None)
+                if close is not None:
+                    close()
+
+    def _render_cached(self, element):
+        """Return the output of an element that has a render cache.
+
+        If the cache is not valid, the element is rendered and its output
+        is stored in the cache, unless the element changes while it is
+        rendered or contains deferred sub-trees.
+
+        """
+        cache = element._render_cache
+        if type(cache) is str:
+            return cache
+        if self.budget is not None:
+            # The element was already counted by the caller and is counted
+            # again when the walk below starts.
+            self._node_count -= 1
+        token = _RenderToken()
+        element._render_cache = token
+        deferred_state = self._deferred_count, len(self._deferred)
+        walk = self._walk([iter((element,))], [None], False, element)
+        output = "".join(
+            [
+                item if isinstance(item, str) else item.decode("utf-8")
+                for item in walk
+            ]
+        )
+        if element._render_cache is token:
+            if (self._deferred_count, len(self._deferred)) == deferred_state:
+                element._render_cache = output
+            else:
+                element._render_cache = _DIRTY
+        return output
+
+    def _walk_profiled(self, stack, closers):
+        """Like _walk(), but record statistics in self.profiler.
+
+        Asynchronous generators are not supported. Time spent by the
+        consumer of the iterator is not counted.
+
+        """
+        kinds = _node_kinds
+        budget = self.budget
+        profiler = self.profiler
+        # Each frame is a [profile, start time, time spent in sub-frames]
+        # list or None, and corresponds to the iterator at the same
+        # position in stack.
+        frames = [None] * len(stack)
+        paused = 0.0
+
+        def now():
+            return perf_counter() - paused
+
+        def record(profile, elapsed, sub_time):
+            profile.total_time += elapsed - sub_time
+            if profile._depth == 0:
+                profile.cumulative_time += elapsed
+            if frames and frames[-1] is not None:
+                frames[-1][2] += elapsed
+
+        try:
+            while stack:
+                frame = frames[-1]
+                for item in stack[-1]:
+                    cls = type(item)
+                    if cls is str or cls is bytes:
+                        if frame is not None:
+                            frame[0].size += _encoded_size(item)
+                        yield_start = perf_counter()
+                        yield item
+                        paused += perf_counter() - yield_start
+                        continue
+                    if item is _DEFERRED_OUTLET:
+                        # The implicit outlet at the end of each render is
+                        # not reported.
+                        stack.append(iter(item._generate_in_context(self)))
+                        closers.append(None)
+                        frames.append(None)
+                        break
+                    if budget is not None and cls is not DeferredOutlet:
+                        self._count_node()
+                    try:
+                        kind = kinds[cls]
+                    except KeyError:
+                        kind = kinds.setdefault(cls, _classify(cls))
+                    if kind == _OTHER:
+                        if not isinstance(item, (str, bytes)):
+                            if not hasattr(item, "generate"):
+                                raise TypeError(
+                                    "can not generate {}".format(repr(item))
+                                )
+                            kind = _GENERATOR
+                        else:
+                            if frame is not None:
+                                frame[0].size += _encoded_size(item)
+                            yield_start = perf_counter()
+                            yield item
+                            paused += perf_counter() - yield_start
+                            continue
+                    profile = profiler._get_profile(cls)
+                    profile.count += 1
+                    start = now()
+                    if kind == _FROZEN:
+                        output = item._html
+                    elif (
+                        kind <= _VOID_ELEMENT
+                        and type(item._render_cache) is str
+                    ):
+                        # Caches are used, but not filled while profiling.
+                        output = item._render_cache
+                        kind = _FROZEN
+                    elif kind in _ELEMENT_KINDS:
+                        output = item.render_start_tag()
+                        profile.start_tag_time += now() - start
+                    if kind == _VOID_ELEMENT or kind == _FROZEN:
+                        if kind == _VOID_ELEMENT:
+                            output += "/>"
+                        profile.size += _encoded_size(output)
+                        record(profile, now() - start, 0.0)
+                        yield_start = perf_counter()
+                        yield output
+                        paused += perf_counter() - yield_start
+                        continue
+                    elif kind == _ELEMENT:
+                        output += ">"
+                        children = item._children
+                        if children is None:
+                            iterator = iter(())
+                        elif type(children) is HTMLChildGenerator:
+                            iterator = iter(children._children)
+                        else:
+                            iterator = iter((children,))
+                        closer = "</" + item.element_name + ">"
+                    elif kind == _NON_VOID_ELEMENT:
+                        output += ">"
+                        iterator = iter(item.generate_children())
+                        closer = "</" + item.element_name + ">"
+                    elif kind == _ASYNC_NON_VOID_ELEMENT:
+                        _async_iterator(item.generate_children(), False)
+                    elif kind == _CHILDREN:
+                        output, closer = None, None
+                        iterator = iter(item._children)
+                    elif kind == _CONTEXTUAL:
+                        output, closer = None, None
+                        iterator = iter(item._generate_in_context(self))
+                    elif kind == _ASYNC_GENERATOR:
+                        _async_iterator(item.generate(), False)
+                    else:
+                        output, closer = None, None
+                        iterator = iter(item.generate())
+                    profile._depth += 1
+                    frames.append([profile, start, 0.0])
+                    if output is not None:
+                        # The start tag is yielded before the end tag is
+                        # pushed, so that the fallback does not include
+                        # the end tag if the budget runs out on it.
+                        profile.size += _encoded_size(output)
+                        yield_start = perf_counter()
+                        yield output
+                        paused += perf_counter() - yield_start
+                    stack.append(iterator)
+                    closers.append(closer)
+                    break
+                else:
+                    closer = closers[-1]
+                    frame = frames.pop()
+                    if frame is not None:
+                        frame[0]._depth -= 1
+                        record(frame[0], now() - frame[1], frame[2])
+                        if closer is not None:
+                            frame[0].size += _encoded_size(closer)
+                    if closer is not None:
+                        yield_start = perf_counter()
+                        yield closer
+                        paused += perf_counter() - yield_start
+                    stack.pop()
+                    closers.pop()
+        finally:
+            while frames:
+                frame = frames.pop()
+                if frame is not None:
+                    frame[0]._depth -= 1
+            while stack:
+                close = getattr(stack.pop(), "close", None)
+                if close is not None:
+                    close()
+
+
+# Value of the _render_cache attribute of elements with an invalid cache.
+_DIRTY = object()
+
+
+class _RenderToken:
+    """Value of _render_cache while the output is recorded."""
+
+
+class _Observable:
+
+    """Mix-in for nodes that can be part of cached elements.
+
+    While the output of an element with a render cache is recorded, the
+    element is registered as observer of all nodes in its sub-tree. When a
+    node changes, it must call _changed(), which invalidates the caches of
+    all observers.
+
+    """
+
+    __slots__ = ("_observers",)
+
+    def __init__(self):
+        super().__init__()
+        self._observers = None
+
+    def _add_observer(self, observer):
+        observers = self._observers
+        if observers is None:
+            self._observers = [ref(observer)]
+            return
+        for observer_ref in observers:
+            if observer_ref() is observer:
+                return
+        observers.append(ref(observer))
+
+    def _changed(self):
+        observers = self._observers
+        if observers is not None:
+            self._observers = None
+            for observer_ref in observers:
+                observer = observer_ref()
+                if observer is not None:
+                    observer._changed()
+
+
+class RenderBudget:
+
+    """Limits for a single rendering pass.
+
+    If the output exceeds max_bytes, more than max_nodes generators are
+    rendered, or rendering takes longer than max_time seconds, rendering
+    is aborted with a RenderBudgetExceeded exception:
+
+        >>> budget = RenderBudget(max_bytes=10)
+        >>> IteratorGenerator(["<p>", "Long text", "</p>"]).render_str(
+        ...     budget=budget
+        ... )  # doctest: +IGNORE_EXCEPTION_DETAIL
+        Traceback (most recent call last):
+        ...
+        htmlgen.generator.RenderBudgetExceeded: output exceeds 10 bytes
+
+    Alternatively, a fallback string or generator can be supplied. When the
+    budget is exceeded, the fallback is rendered in place of the rest of
+    the tree, and all open elements are closed:
+
+        >>> from htmlgen import Division
+        >>> budget = RenderBudget(max_nodes=2, fallback="...")
+        >>> Division(Division("foo"), Division("bar")).render_str(
+        ...     budget=budget
+        ... )
+        '<div><div>foo</div>...</div>'
+
+    The output size is counted in UTF-8 encoded bytes. Rendering can only
+    be aborted between two generated items, not while a generate() method
+    is blocked. The nested generators are closed when rendering is
+    aborted.
+
+    A budget can be used for multiple rendering passes.
+
+    """
+
+    def __init__(
+        self, max_bytes=None, max_nodes=None, max_time=None, fallback=None
+    ):
+        self.max_bytes = max_bytes
+        self.max_nodes = max_nodes
+        self.max_time = max_time
+        self.fallback = fallback
+
+
+class RenderBudgetExceeded(Exception):
+    """Raised when a rendering pass exceeds its RenderBudget."""
+
+
+class _WalkFrame:
+    def __init__(self, stack, closers):
+        self.stack = stack
+        self.closers = closers
+        self.walk = None
+
+
+async def _close_frames(frames):
+    while frames:
+        frame = frames.pop()
+        if type(frame) is _AsyncIterator:
+            aclose = getattr(frame.iterator, "aclose", None)
+            if aclose is not None:
+                await aclose()
+        else:
+            frame.walk.close()
+
+
+class _AsyncIterator:
+    def __init__(self, iterator):
+        self.iterator = iterator
+
+
+def _async_iterator(iterator, allow_async):
+    if not allow_async:
+        raise TypeError(
+            "asynchronous generators can only be rendered with aiter()"
+        )
+    return _AsyncIterator(iterator)
+
+
+# Node kinds. Kinds of elements whose output can be cached come first.
+_ELEMENT = 0
+_NON_VOID_ELEMENT = 1
+_VOID_ELEMENT = 2
+_ASYNC_NON_VOID_ELEMENT = 3
+_CHILDREN = 4
+_GENERATOR = 5
+_ASYNC_GENERATOR = 6
+_CONTEXTUAL = 7
+_FROZEN = 8
+_OTHER = 9
+
+_ELEMENT_KINDS = frozenset(
+    [_ELEMENT, _NON_VOID_ELEMENT, _VOID_ELEMENT, _ASYNC_NON_VOID_ELEMENT]
+)
+
+_node_kinds = {}
+
+# The active htmlgen.RenderProfiler, if any.
+_active_profiler = ContextVar("_active_profiler", default=None)
+
+
+def _encoded_size(item):
+    if isinstance(item, str) and not item.isascii():
+        return len(item.encode("utf-8"))
+    return len(item)
+
+
+def _observe(item, kind, recorder):
+    """Invalidate the render cache of recorder when item changes."""
+    add_observer = getattr(item, "_add_observer", None)
+    if add_observer is not None and item is not recorder:
+        add_observer(recorder)
+    if kind == _ELEMENT:
+        # The children of stock elements are not walked as separate node.
+        children = item._children
+        if type(children) is HTMLChildGenerator:
+            children._add_observer(recorder)
+
+
+def _classify(cls):
+    """Return how instances of a class are rendered by RenderContext."""
+    from htmlgen.element import Element, NonVoidElement, VoidElement
+
+    generate = getattr(cls, "generate", None)
+    if generate is None or issubclass(cls, (str, bytes)):
+        return _OTHER
+    elif hasattr(cls, "_generate_in_context"):
+        return _CONTEXTUAL
+    elif isasyncgenfunction(generate):
+        return _ASYNC_GENERATOR
+    elif generate is NonVoidElement.generate:
+        if (
+            issubclass(cls, Element)
+            and cls.generate_children is Element.generate_children
+        ):
+            return _ELEMENT
+        elif isasyncgenfunction(cls.generate_children):
+            return _ASYNC_NON_VOID_ELEMENT
+        return _NON_VOID_ELEMENT
+    elif generate is VoidElement.generate:
+        return _VOID_ELEMENT
+    elif (
+        generate is ChildGenerator.generate
+        or generate is HTMLChildGenerator.generate
+    ):
+        return _CHILDREN
+    elif generate is FrozenGenerator.generate:
+        return _FROZEN
+    return _GENERATOR
+
+
+_DEFERRED_ATTRIBUTE = "data-htmlgen-deferred"
+
+_SWAP_SCRIPT = (
+    "(function(){{"
+    "var s='[" + _DEFERRED_ATTRIBUTE + '="{0}"]\','
+    "t=document.querySelector('template'+s);"
+    "document.querySelector(s).replaceWith(t.content);"
+    "t.remove()"
+    "}})()"
+)
+
+
+class DeferredOutlet(Generator):
+
+    """Insert the sub-trees deferred during rendering.
+
+    See htmlgen.Deferred for details. Each deferred sub-tree is rendered
+    into a <template> element, followed by a small script that replaces
+    the placeholder with the template's content:
+
+        >>> from htmlgen import Deferred
+        >>> generator = ChildGenerator()
+        >>> generator.append(Deferred("Slow", "Loading..."))
+        >>> generator.append(DeferredOutlet())
+        >>> str(generator)  # doctest: +ELLIPSIS
+        '<div data-htmlgen-deferred="0">Loading...</div><template data-htmlgen-deferred="0">Slow</template><script>...</script>'
+
+    Body elements end with an outlet. Pending deferred sub-trees are also
+    rendered at the end of the output.
+
+    """
+
+    __slots__ = ()
+
+    def generate(self):
+        return iter([])
+
+    def _generate_in_context(self, context):
+        for key, content in context.iter_deferred():
+            yield "<template " + _DEFERRED_ATTRIBUTE + '="' + key + '">'
+            yield content
+            yield "</template><script>" + _SWAP_SCRIPT.format(key)
+            yield "</script>"
+
+
+_DEFERRED_OUTLET = DeferredOutlet()
+
+
+class _ChunkBuffer:
+    def __init__(self):
+        self._chunks = []
+        self._strings = []
+        self.size = 0
+
+    def __bool__(self):
+        return self.size > 0
+
+    def append(self, item):
+        if isinstance(item, str):
+            self._strings.append(item)
+        else:
+            self._join_strings()
+            self._chunks.append(item)
+        # Lengths of strings are counted in characters. This can only
+        # underestimate the size of the encoded chunk.
+        self.size += len(item)
+
+    def flush(self):
+        return b"".join(self.flush_pieces())
+
+    def flush_pieces(self):
+        self._join_strings()
+        pieces = self._chunks
+        self._chunks = []
+        self.size = 0
+        return pieces
+
+    def _join_strings(self):
+        if self._strings:
+            self._chunks.append("".join(self._strings).encode("utf-8"))
+            self._strings = []
+
+
+_END = object()
+
+
+class _Failure:
+    def __init__(self, exception):
+        self.exception = exception
+
+
+class _BackgroundIterator:
+    """Iterate over an iterable in a background thread.
+
+    Use as a context manager. The background thread stops when the
+    context is left.
+
+    """
+
+    def __init__(self, iterable, queue_size=1024):
+        self._queue = Queue(queue_size)
+        self._stop = Event()
+        self._thread = Thread(
+            target=copy_context().run,
+            args=(self._produce, iterable),
+            daemon=True,
+        )
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self._stop.set()
+
+    def next(self, timeout=None):
+        """Return the next item.
+
+        Raise queue.Empty if no item is available within timeout seconds,
+        and StopIteration if the iterable is exhausted.
+
+        """
+        item = self._queue.get(timeout=timeout)
+        if item is _END:
+            raise StopIteration()
+        elif isinstance(item, _Failure):
+            raise item.exception
+        return item
+
+    def _produce(self, iterable):
+        try:
+            for item in iterable:
+                if not self._put(item):
+                    return
+        except BaseException as exc:
+            self._put(_Failure(exc))
+        else:
+            self._put(_END)
+
+    def _put(self, item):
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+            except Full:
+                pass
+            else:
+                return True
+        return False
+
+
 class NullGenerator(Generator):
 
     """A generator that generates nothing."""
 
+    __slots__ = ()
+
     def generate(self):
         return iter([])
 
@@ -80,18 +1119,224 @@ class IteratorGenerator(Generator):
         >>> list(iter(generator))
         [b'foo', b'bar']
 
+    Asynchronous iterators are supported as well, but can only be rendered
+    using Generator.aiter().
+
     """
 
+    __slots__ = ("_iterator",)
+
     def __init__(self, iterator):
         super(IteratorGenerator, self).__init__()
         self._iterator = iterator
 
     def generate(self):
-        for item in self._iterator:
-            yield item
+        if hasattr(self._iterator, "__aiter__"):
+            return self._iterator.__aiter__()
+        return iter(self._iterator)
+
+
+class FutureGenerator(Generator):
+
+    """A generator that generates the result of a future.
 
+    This can be used to fetch the data for several parts of a tree
+    concurrently, while the tree is constructed. Use submit() to run a
+    function on an executor from the concurrent.futures module:
+
+        >>> from concurrent.futures import ThreadPoolExecutor
+        >>> executor = ThreadPoolExecutor()
+        >>> generator = FutureGenerator.submit(executor, str.upper, "<foo>")
+        >>> str(generator)
+        '&lt;FOO&gt;'
+
+    When rendered, the generator waits until the future's result is
+    available. The result can be a string, which will be escaped, or a
+    sub-generator. When rendered using Generator.aiter(), the event loop
+    is not blocked while waiting. If the future raises an exception, it
+    is propagated.
+
+    """
+
+    __slots__ = ("future",)
+
+    def __init__(self, future):
+        super(FutureGenerator, self).__init__()
+        self.future = future
+
+    @classmethod
+    def submit(cls, executor, function, *args, **kwargs):
+        """Run function on executor and return a FutureGenerator."""
+        return cls(executor.submit(function, *args, **kwargs))
+
+    def generate(self):
+        yield generate_html_string(self.future.result())
+
+    def _generate_in_context(self, context):
+        if context.asynchronous and not self.future.done():
+            return self._generate_async()
+        return self.generate()
+
+    async def _generate_async(self):
+        import asyncio
+
+        yield generate_html_string(await asyncio.wrap_future(self.future))
+
+
+class FrozenGenerator(Generator):
+
+    """A generator that generates the pre-rendered output of a sub-tree.
+
+    The sub-tree is rendered once, when the FrozenGenerator is created.
+    Afterwards, the output is generated as a single string, without walking
+    the sub-tree again. This is useful for parts of a page that rarely
+    change, like navigation menus:
+
+        >>> from htmlgen import Division, Span
+        >>> navigation = Division(Span("Home"), Span("About"))
+        >>> frozen_navigation = navigation.freeze()
+        >>> navigation.append(Span("Contact"))
+        >>> str(Division(frozen_navigation))
+        '<div><div><span>Home</span><span>About</span></div></div>'
+        >>> frozen_navigation.html
+        '<div><span>Home</span><span>About</span></div>'
+
+    Later changes to the sub-tree do not affect the output. Sub-trees that
+    contain htmlgen.Deferred elements or asynchronous generators can not be
+    frozen.
+
+    """
+
+    __slots__ = ("_html",)
+
+    def __init__(self, generator):
+        super(FrozenGenerator, self).__init__()
+        self._html = _render_frozen(generator)
+
+    @classmethod
+    def _from_html(cls, html):
+        generator = cls.__new__(cls)
+        generator._html = html
+        return generator
+
+    @property
+    def html(self):
+        """Return the pre-rendered output."""
+        return self._html
+
+    def generate(self):
+        yield self._html
 
-class ChildGenerator(Generator):
+
+def _render_frozen(generator):
+    """Render a sub-tree into a string that can be reused.
+
+    Raise a ValueError if the sub-tree contains deferred sub-trees.
+
+    """
+    context = RenderContext(generator)
+    html = "".join(
+        [
+            item if isinstance(item, str) else item.decode("utf-8")
+            for item in context
+        ]
+    )
+    if context._deferred_count > 0:
+        raise ValueError("can not freeze deferred sub-trees")
+    return html
+
+
+def frozen(generator):
+    """Return a FrozenGenerator for a generator or string.
+
+    Strings are HTML-escaped:
+
+        >>> str(frozen("<Test>"))
+        '&lt;Test&gt;'
+
+    If generator is already a FrozenGenerator, it is returned unchanged.
+
+    """
+    if isinstance(generator, FrozenGenerator):
+        return generator
+    return FrozenGenerator(generate_html_string(generator))
+
+
+class InternTable:
+
+    """Share frozen generators between identical sub-trees.
+
+    intern() freezes a sub-tree, but returns an existing FrozenGenerator
+    if a sub-tree with the same output has been interned before:
+
+        >>> from htmlgen import Span
+        >>> table = InternTable()
+        >>> first = table.intern(Span("N/A"))
+        >>> second = table.intern(Span("N/A"))
+        >>> first is second
+        True
+        >>> len(table)
+        1
+
+    This reduces the memory used by large trees with many identical
+    leaves, like table cells or icons. The original sub-trees are not
+    referenced by the table. Interned generators are removed from the
+    table when they are no longer used elsewhere.
+
+    """
+
+    def __init__(self):
+        self._generators = WeakValueDictionary()
+        self._lock = Lock()
+
+    def __len__(self):
+        """Return the number of interned generators."""
+        return len(self._generators)
+
+    def intern(self, generator):
+        """Return a shared FrozenGenerator for a sub-tree or string.
+
+        Like frozen(), strings are HTML-escaped.
+
+        """
+        if isinstance(generator, FrozenGenerator):
+            html = generator._html
+        else:
+            html = _render_frozen(generate_html_string(generator))
+        with self._lock:
+            shared = self._generators.get(html)
+            if shared is None:
+                if not isinstance(generator, FrozenGenerator):
+                    generator = FrozenGenerator._from_html(html)
+                shared = self._generators[html] = generator
+        return shared
+
+    def clear(self):
+        """Remove all interned generators from the table."""
+        with self._lock:
+            self._generators.clear()
+
+
+_intern_table = InternTable()
+
+
+def interned(generator):
+    """Return a shared FrozenGenerator for a sub-tree or string.
+
+    This uses a global InternTable:
+
+        >>> from htmlgen import Link
+        >>> link = interned(Link("/", "Home"))
+        >>> link is interned(Link("/", "Home"))
+        True
+        >>> str(link)
+        '<a href="/">Home</a>'
+
+    """
+    return _intern_table.intern(generator)
+
+
+class ChildGenerator(Generator, _Observable):
 
     """A generator that generates children appended to it.
 
@@ -108,6 +1353,8 @@ class ChildGenerator(Generator):
 
     """
 
+    __slots__ = ("_children",)
+
     def __init__(self):
         super(ChildGenerator, self).__init__()
         self._children = []
@@ -125,12 +1372,14 @@ class ChildGenerator(Generator):
         if child is None:
             raise TypeError("child can not be None")
         self._children.append(child)
+        self._changed()
 
     def extend(self, children):
         """Append multiple strings and sub generators."""
         if any(child is None for child in children):
             raise TypeError("child can not be None")
         self._children.extend(children)
+        self._changed()
 
     def remove(self, child):
         """Remove a string or sub-generator.
@@ -139,10 +1388,12 @@ class ChildGenerator(Generator):
 
         """
         self._children.remove(child)
+        self._changed()
 
     def empty(self):
         """Remove all children."""
         self._children = []
+        self._changed()
 
     @property
     def children(self):
@@ -159,7 +1410,7 @@ class ChildGenerator(Generator):
         return iter(self._children)
 
 
-class HTMLChildGenerator(Generator):
+class HTMLChildGenerator(Generator, _Observable):
 
     """A generator that handles HTML safely.
 
@@ -192,9 +1443,14 @@ class HTMLChildGenerator(Generator):
 
     """
 
+    __slots__ = ("_children",)
+
     def __init__(self):
         super(HTMLChildGenerator, self).__init__()
-        self._children = ChildGenerator()
+        # Children are stored in a plain list, already escaped, instead of
+        # a nested ChildGenerator. This saves an object per element and
+        # a generator layer when rendering.
+        self._children = []
 
     def __len__(self):
         """Return the number of children.
@@ -210,9 +1466,12 @@ class HTMLChildGenerator(Generator):
         Strings are escaped to be HTML-safe.
 
         """
+        if child is None:
+            raise TypeError("child can not be None")
         if not hasattr(child, "generate"):
             child = escape(child)
-        self.append_raw(child)
+        self._children.append(child)
+        self._changed()
 
     def append_raw(self, child):
         """Append a string or sub generator without escaping it.
@@ -221,7 +1480,10 @@ class HTMLChildGenerator(Generator):
         with HTML from trusted sources.
 
         """
+        if child is None:
+            raise TypeError("child can not be None")
         self._children.append(child)
+        self._changed()
 
     def extend(self, children):
         """Append multiple strings and sub generators.
@@ -229,8 +1491,14 @@ class HTMLChildGenerator(Generator):
         Strings are escaped to be HTML-safe.
 
         """
-        for child in children:
-            self.append(child)
+        self.extend_raw(
+            [
+                child
+                if child is None or hasattr(child, "generate")
+                else escape(child)
+                for child in children
+            ]
+        )
 
     def extend_raw(self, children):
         """Append multiple strings and sub generators, without escaping them.
@@ -239,8 +1507,11 @@ class HTMLChildGenerator(Generator):
         with HTML from trusted sources.
 
         """
-        for child in children:
-            self.append_raw(child)
+        children = list(children)
+        if any(child is None for child in children):
+            raise TypeError("child can not be None")
+        self._children.extend(children)
+        self._changed()
 
     def remove(self, child):
         """Remove a string or sub-generator.
@@ -252,10 +1523,9 @@ class HTMLChildGenerator(Generator):
         If the string or sub-generator is not found, raises a ValueError.
 
         """
-        # if not hasattr(child, "generate"):
         if not hasattr(child, "generate"):
             child = escape(child)
-        self._children.remove(child)
+        self.remove_raw(child)
 
     def remove_raw(self, child):
         """Remove a string or sub-generator.
@@ -268,10 +1538,12 @@ class HTMLChildGenerator(Generator):
 
         """
         self._children.remove(child)
+        self._changed()
 
     def empty(self):
         """Remove all children."""
-        self._children.empty()
+        self._children = []
+        self._changed()
 
     @property
     def children(self):
@@ -280,7 +1552,7 @@ class HTMLChildGenerator(Generator):
         String children are already HTML-escaped.
 
         """
-        return self._children.children
+        return self._children[:]
 
     def generate(self):
         """Return an iterator over all children, in order.
@@ -289,7 +1561,7 @@ class HTMLChildGenerator(Generator):
         if desired.
 
         """
-        return self._children.generate()
+        return iter(self._children)
 
 
 def generate_html_string(s):
@@ -338,6 +1610,8 @@ class JoinGenerator(ChildGenerator):
 
     """
 
+    __slots__ = ("_glue",)
+
     def __init__(self, glue, pieces=None):
         super(JoinGenerator, self).__init__()
         self._glue = glue
@@ -370,6 +1644,8 @@ class HTMLJoinGenerator(HTMLChildGenerator):
 
     """
 
+    __slots__ = ("_glue",)
+
     def __init__(self, glue, pieces=None):
         super(HTMLJoinGenerator, self).__init__()
         self._glue = escape(glue)
@@ -1,4 +1,14 @@
+from concurrent.futures import Executor, Future
+
+from htmlgen.profiler import RenderProfiler
 from typing import (
+    Any,
+    AsyncGenerator,
+    Callable,
+    AsyncIterable,
+    Protocol,
+    Tuple,
+    TypeVar,
     Union,
     Iterator,
     Optional,
@@ -7,15 +17,101 @@ from typing import (
     Generator as GeneratorType,
 )
 
+_GV = TypeVar("_GV", bound=Union[str, bytes, Generator])
+
+class _LinesWriter(Protocol):
+    def writelines(self, __lines: List[bytes]) -> object: ...
+
 class Generator:
     def __iter__(self) -> Iterator[bytes]: ...
     def __str__(self) -> str: ...
-    def generate(self) -> GenValueGenerator: ...
+    def render_str(self, budget: Optional[RenderBudget] = ...) -> str: ...
+    def render_bytes(self, budget: Optional[RenderBudget] = ...) -> bytes: ...
+    def aiter(
+        self, budget: Optional[RenderBudget] = ...
+    ) -> AsyncGenerator[bytes, None]: ...
+    def iter_chunks(
+        self,
+        min_size: int = ...,
+        max_delay: Optional[float] = ...,
+        budget: Optional[RenderBudget] = ...,
+    ) -> GeneratorType[bytes, None, None]: ...
+    def write_to(
+        self,
+        fileobj: _LinesWriter,
+        batch_size: int = ...,
+        budget: Optional[RenderBudget] = ...,
+    ) -> None: ...
+    def measure(self, budget: Optional[RenderBudget] = ...) -> int: ...
+    def freeze(self) -> FrozenGenerator: ...
+    def generate(
+        self,
+    ) -> Union[GenValueGenerator, AsyncGenerator[GenValue, None]]: ...
+
+class RenderContext:
+    root: Generator
+    budget: Optional[RenderBudget]
+    profiler: Optional[RenderProfiler]
+    asynchronous: bool
+    def __init__(
+        self, root: Generator, budget: Optional[RenderBudget] = ...
+    ) -> None: ...
+    def __iter__(self) -> Iterator[Union[str, bytes]]: ...
+    def __aiter__(self) -> AsyncGenerator[Union[str, bytes], None]: ...
+
+    def defer(self, content: GenValue) -> str: ...
+    def iter_deferred(self) -> Iterator[Tuple[str, GenValue]]: ...
+
+class RenderBudget:
+    max_bytes: Optional[int]
+    max_nodes: Optional[int]
+    max_time: Optional[float]
+    fallback: Optional[GenValue]
+    def __init__(
+        self,
+        max_bytes: Optional[int] = ...,
+        max_nodes: Optional[int] = ...,
+        max_time: Optional[float] = ...,
+        fallback: Optional[GenValue] = ...,
+    ) -> None: ...
+
+class RenderBudgetExceeded(Exception): ...
+
+class DeferredOutlet(Generator): ...
 
 class NullGenerator(Generator): ...
 
 class IteratorGenerator(Generator):
-    def __init__(self, iterator: Iterable[GenValue]) -> None: ...
+    def __init__(
+        self, iterator: Union[Iterable[GenValue], AsyncIterable[GenValue]]
+    ) -> None: ...
+
+class FutureGenerator(Generator):
+    future: Future[Any]
+    def __init__(self, future: Future[_GV]) -> None: ...
+    @classmethod
+    def submit(
+        cls,
+        executor: Executor,
+        function: Callable[..., GenValue],
+        *args: Any,
+        **kwargs: Any,
+    ) -> FutureGenerator: ...
+
+class FrozenGenerator(Generator):
+    def __init__(self, generator: Generator) -> None: ...
+    @property
+    def html(self) -> str: ...
+
+def frozen(generator: GenValue) -> FrozenGenerator: ...
+
+class InternTable:
+    def __init__(self) -> None: ...
+    def __len__(self) -> int: ...
+    def intern(self, generator: GenValue) -> FrozenGenerator: ...
+    def clear(self) -> None: ...
+
+def interned(generator: GenValue) -> FrozenGenerator: ...
 
 class ChildGenerator(Generator):
     def __init__(self) -> None: ...
@@ -18,6 +18,8 @@ class Image(VoidElement):
         >>> image.title = "Whiteboards are a useful tool"
     """
 
+    __slots__ = ()
+
     def __init__(self, url, alternate_text=""):
         super().__init__("img")
         self.url = url
@@ -12,6 +12,8 @@ class Span(Element):
         >>> span2.append("Example text")
     """
 
+    __slots__ = ()
+
     def __init__(self, *content):
         super().__init__("span")
         self.extend(content)
@@ -38,6 +40,8 @@ class Highlight(Element):
         >>> span.append(" family.")
     """
 
+    __slots__ = ()
+
     def __init__(self, *content):
         super().__init__("b")
         self.extend(content)
@@ -53,6 +57,8 @@ class Strong(Element):
         >>> Strong("It is imperative to turn off the froblunator after use!"))
     """
 
+    __slots__ = ()
+
     def __init__(self, *content):
         super().__init__("strong")
         self.extend(content)
@@ -76,6 +82,8 @@ class Alternate(Element):
         >>> span.append(".")
     """
 
+    __slots__ = ()
+
     def __init__(self, *content):
         super().__init__("i")
         self.extend(content)
@@ -93,6 +101,8 @@ class Emphasis(Element):
         >>> span.append(" is great.")
     """
 
+    __slots__ = ()
+
     def __init__(self, *content):
         super().__init__("em")
         self.extend(content)
@@ -109,6 +119,8 @@ class Small(Element):
         >>> Small("Copyright (C) 2010")
     """
 
+    __slots__ = ()
+
     def __init__(self, *content):
         super().__init__("small")
         self.extend(content)
@@ -117,5 +129,7 @@ class Small(Element):
 class LineBreak(VoidElement):
     """An HTML line break (<br>) element."""
 
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("br")
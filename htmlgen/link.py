@@ -28,6 +28,8 @@ class Link(Element):
     Please refer to the HeadLink class for <link> elements.
     """
 
+    __slots__ = ()
+
     def __init__(self, url, *content):
         super().__init__("a")
         self.url = url
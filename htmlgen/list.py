@@ -5,6 +5,8 @@ from htmlgen.element import Element
 class _ListBase(Element):
     """Base class for HTML list elements."""
 
+    __slots__ = ()
+
     def create_item(self, child=None):
         """Create a ListItem element and add it to this list."""
         item = ListItem()
@@ -32,6 +34,8 @@ class OrderedList(_ListBase):
         >>> list_.append(ListItem("Second Item"))
     """
 
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("ol")
 
@@ -49,6 +53,8 @@ class UnorderedList(_ListBase):
         >>> list_.append(ListItem("Second Item"))
     """
 
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("ul")
 
@@ -59,6 +65,8 @@ class ListItem(Element):
     These elements are used as children of OrderedList and UnorderedList.
     """
 
+    __slots__ = ()
+
     def __init__(self, *content):
         super().__init__("li")
         self.extend(content)
@@ -77,6 +85,8 @@ class DescriptionList(Element):
         '<dl><dt class="my-term">Term</dt><dd>Long description.</dd></dl>'
     """
 
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("dl")
 
@@ -96,6 +106,8 @@ class DescriptionList(Element):
 class DescriptionTerm(Element):
     """An HTML term element (<dt>) for description lists."""
 
+    __slots__ = ()
+
     def __init__(self, *content):
         super().__init__("dt")
         self.extend(content)
@@ -104,6 +116,8 @@ class DescriptionTerm(Element):
 class DescriptionDefinition(Element):
     """An HTML definition element (<dd>) for description lists."""
 
+    __slots__ = ()
+
     def __init__(self, *content):
         super().__init__("dd")
         self.extend(content)
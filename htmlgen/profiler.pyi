@@ -0,0 +1,32 @@
+from typing import Any, List, Optional, TextIO, Type
+
+from htmlgen.generator import Generator
+
+class RenderProfiler:
+    def __init__(self) -> None: ...
+    def __enter__(self) -> RenderProfiler: ...
+    def __exit__(self, *args: Any) -> None: ...
+    @property
+    def profiles(self) -> List[ClassProfile]: ...
+    def get_profile(self, cls: Type[Any]) -> Optional[ClassProfile]: ...
+    def clear(self) -> None: ...
+    def format_stats(
+        self, sort: str = ..., limit: Optional[int] = ...
+    ) -> str: ...
+    def print_stats(
+        self,
+        sort: str = ...,
+        limit: Optional[int] = ...,
+        file: Optional[TextIO] = ...,
+    ) -> None: ...
+
+class ClassProfile:
+    generator_class: Type[Any]
+    count: int
+    total_time: float
+    cumulative_time: float
+    start_tag_time: float
+    size: int
+    def __init__(self, generator_class: Type[Any]) -> None: ...
+    @property
+    def name(self) -> str: ...
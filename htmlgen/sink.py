@@ -0,0 +1,102 @@
+"""Output sinks for Generator.write_to().
+
+The sinks in this module write batches of byte strings with a single system
+call, using vectored I/O where the platform supports it.
+
+"""
+
+import os
+
+try:
+    _IOV_MAX = os.sysconf("SC_IOV_MAX")
+except (AttributeError, ValueError, OSError):
+    _IOV_MAX = 1024
+if _IOV_MAX <= 0:
+    _IOV_MAX = 1024
+
+
+class FileDescriptorSink:
+    """Write output to a blocking file descriptor.
+
+        >>> from htmlgen import Division
+        >>> read_fd, write_fd = os.pipe()
+        >>> Division("Test").write_to(FileDescriptorSink(write_fd))
+        >>> os.read(read_fd, 100)
+        b'<div>Test</div>'
+        >>> os.close(read_fd)
+        >>> os.close(write_fd)
+
+    Batches are written using os.writev(), if it is available.
+
+    """
+
+    def __init__(self, fd):
+        self.fd = fd
+
+    def write(self, data):
+        """Write a single byte string."""
+        self.writelines([data])
+
+    def writelines(self, chunks):
+        """Write multiple byte strings."""
+        if hasattr(os, "writev"):
+            _write_all(self._writev, chunks)
+        else:
+            for chunk in chunks:
+                _write_all(self._write, [chunk])
+
+    def _writev(self, buffers):
+        return os.writev(self.fd, buffers)
+
+    def _write(self, buffers):
+        return os.write(self.fd, buffers[0])
+
+
+class SocketSink:
+    """Write output to a blocking socket.
+
+        >>> import socket
+        >>> from htmlgen import Division
+        >>> sock1, sock2 = socket.socketpair()
+        >>> Division("Test").write_to(SocketSink(sock1))
+        >>> sock2.recv(100)
+        b'<div>Test</div>'
+        >>> sock1.close()
+        >>> sock2.close()
+
+    Batches are written using socket.sendmsg(), if it is available.
+
+    """
+
+    def __init__(self, sock):
+        self.socket = sock
+
+    def write(self, data):
+        """Write a single byte string."""
+        self.writelines([data])
+
+    def writelines(self, chunks):
+        """Write multiple byte strings."""
+        if hasattr(self.socket, "sendmsg"):
+            _write_all(self.socket.sendmsg, chunks)
+        else:
+            for chunk in chunks:
+                self.socket.sendall(chunk)
+
+
+def _write_all(writev, chunks):
+    """Write all chunks, using a vectored write function.
+
+    writev is called with a list of buffers and must return the number of
+    bytes written. It is called repeatedly, until all data is written.
+
+    """
+    buffers = [chunk for chunk in chunks if chunk]
+    start = 0
+    while start < len(buffers):
+        written = writev(buffers[start : start + _IOV_MAX])
+        while start < len(buffers) and written >= len(buffers[start]):
+            written -= len(buffers[start])
+            start += 1
+        if written > 0:
+            buffers[start] = memoryview(buffers[start])[written:]
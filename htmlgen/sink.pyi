@@ -0,0 +1,19 @@
+from socket import socket as _Socket
+from typing import Callable, Iterable, List, Union
+
+class FileDescriptorSink:
+    fd: int
+    def __init__(self, fd: int) -> None: ...
+    def write(self, data: bytes) -> None: ...
+    def writelines(self, chunks: Iterable[bytes]) -> None: ...
+
+class SocketSink:
+    socket: _Socket
+    def __init__(self, sock: _Socket) -> None: ...
+    def write(self, data: bytes) -> None: ...
+    def writelines(self, chunks: Iterable[bytes]) -> None: ...
+
+def _write_all(
+    writev: Callable[[List[Union[bytes, memoryview]]], int],
+    chunks: Iterable[bytes],
+) -> None: ...
@@ -7,6 +7,8 @@ class Section(Element):
     Sections are logical units in a document, like chapter and sub-chapters.
     """
 
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("section")
 
@@ -18,6 +20,8 @@ class Article(Element):
     blog system.
     """
 
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("article")
 
@@ -25,6 +29,8 @@ class Article(Element):
 class Navigation(Element):
     """An HTML navigation container (<nav>) element."""
 
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("nav")
 
@@ -33,6 +39,8 @@ class Aside(Element):
     """An HTML element for tangential related content (<aside>).
     """
 
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("aside")
 
@@ -44,6 +52,8 @@ class Header(Element):
     of a section or page.
     """
 
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("header")
 
@@ -54,6 +64,8 @@ class Footer(Element):
     Footer elements group the footer elements of a section or page.
     """
 
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("footer")
 
@@ -75,6 +87,8 @@ class Heading(Element):
         '<header><h1>Hello World!</h1><h2>The philosophical ramification of programming in a postmodern society</h2></header>'
     """
 
+    __slots__ = ("level",)
+
     def __init__(self, level=1, *content):
         if level < 1 or level > 6:
             raise TypeError("heading level must be between 1 and 6")
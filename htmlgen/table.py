@@ -1,5 +1,12 @@
+from itertools import chain
+
 from htmlgen.attribute import int_html_attribute
-from htmlgen.element import Element
+from htmlgen.element import Element, NonVoidElement
+from htmlgen.generator import (
+    IteratorGenerator,
+    NullGenerator,
+    generate_html_string,
+)
 
 
 class Table(Element):
@@ -38,6 +45,8 @@ class Table(Element):
         >>> row = table.create_simple_row("Content 1", "Content 2")
     """
 
+    __slots__ = ("_head", "_body")
+
     def __init__(self):
         super().__init__("table")
         self._head = TableHead()
@@ -168,25 +177,33 @@ class Table(Element):
         return row
 
     def generate_children(self):
-        if self._head.children:
+        if len(self._head):
             yield self._head
-        head = TableHead()
-        head.extend(self.generate_header_rows())
-        if len(head):
-            yield head
+        yield self._generate_section(TableHead(), self.generate_header_rows())
         if len(self._body):
             yield self._body
-        body = TableBody()
-        body.extend(self.generate_rows())
-        if len(body):
-            yield body
-        for child in self.children:
-            yield child
+        yield self._generate_section(TableBody(), self.generate_rows())
+        if self._children is not None:
+            yield self._children
+
+    @staticmethod
+    def _generate_section(section, rows):
+        if hasattr(rows, "__aiter__"):
+            return IteratorGenerator(_generate_async_section(section, rows))
+        # Rows are streamed instead of collected, so that a RenderBudget
+        # can stop large sections. Only the first row is fetched up front,
+        # to decide whether the section is rendered at all.
+        rows = iter(rows)
+        for first_row in rows:
+            return _StreamedSection(section, chain((first_row,), rows))
+        return NullGenerator()
 
     def generate_header_rows(self):
         """Return an iterator over rows of this table's head.
 
-        This method can be overridden by sub-classes.
+        This method can be overridden by sub-classes. It can also be
+        an asynchronous generator, but then the table must be rendered
+        using aiter().
 
         """
         if False:
@@ -195,14 +212,44 @@ class Table(Element):
     def generate_rows(self):
         """Return an iterator over rows of this table's body.
 
-        This method can be overridden by sub-classes.
+        This method can be overridden by sub-classes. It can also be
+        an asynchronous generator, for example to stream rows from a
+        database, but then the table must be rendered using aiter().
 
         """
         if False:
             yield
 
 
+async def _generate_async_section(section, rows):
+    """Generate a table section, if rows is not empty."""
+    empty = True
+    async for row in rows:
+        if empty:
+            yield section.render_start_tag() + ">"
+            empty = False
+        yield row
+    if not empty:
+        yield "</" + section.element_name + ">"
+
+
+class _StreamedSection(NonVoidElement):
+    """A table section that generates rows from an iterator."""
+
+    __slots__ = ("_rows",)
+
+    def __init__(self, section, rows):
+        super().__init__(section.element_name)
+        self._rows = rows
+
+    def generate_children(self):
+        for row in self._rows:
+            yield generate_html_string(row)
+
+
 class _TableSection(Element):
+    __slots__ = ()
+
     def create_row(self):
         """Create a TableRow, append it to this section, and return it."""
         row = TableRow()
@@ -220,6 +267,8 @@ class TableHead(_TableSection):
         '<thead><tr id="my-row"></tr></thead>'
     """
 
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("thead")
 
@@ -234,6 +283,8 @@ class TableBody(_TableSection):
         '<tbody><tr id="my-row"></tr></tbody>'
     """
 
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("tbody")
 
@@ -249,6 +300,8 @@ class TableRow(Element):
         '<tr><td>Cell 1</td><td>Cell 2</td></tr>'
     """
 
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("tr")
 
@@ -299,6 +352,8 @@ class TableRow(Element):
 
 
 class _TableCellBase(Element):
+    __slots__ = ()
+
     def __init__(self, element_name, *content):
         super().__init__(element_name)
         self.extend(content)
@@ -317,6 +372,8 @@ class TableHeaderCell(_TableCellBase):
         >>> cell2.append("Content")
     """
 
+    __slots__ = ()
+
     def __init__(self, *content):
         super().__init__("th", *content)
 
@@ -331,6 +388,8 @@ class TableCell(_TableCellBase):
         >>> cell2.append("Content")
     """
 
+    __slots__ = ()
+
     def __init__(self, *content):
         super().__init__("td", *content)
 
@@ -343,6 +402,8 @@ class ColumnGroup(Element):
         >>> col.add_css_classes("column-class")
     """
 
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("colgroup")
 
@@ -366,5 +427,7 @@ class ColumnGroup(Element):
 class Column(Element):
     """An HTML column (<col>) element."""
 
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("col")
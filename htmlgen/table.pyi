@@ -19,9 +19,17 @@ class Table(Element):
         self, *cells: Union[str, bytes, Generator]
     ) -> TableRow: ...
     def generate_header_rows(
-        self
-    ) -> typing.Generator[TableRow, None, None]: ...
-    def generate_rows(self) -> typing.Generator[TableRow, None, None]: ...
+        self,
+    ) -> Union[
+        typing.Generator[TableRow, None, None],
+        typing.AsyncGenerator[TableRow, None],
+    ]: ...
+    def generate_rows(
+        self,
+    ) -> Union[
+        typing.Generator[TableRow, None, None],
+        typing.AsyncGenerator[TableRow, None],
+    ]: ...
 
 class TableHead(Element):
     def __init__(self) -> None: ...
@@ -0,0 +1,168 @@
+"""Compiled templates.
+
+compile_template() renders a tree containing slots once and splits the
+output into static segments and slots. Rendering a template only needs
+to interleave the segments with the slot values.
+
+"""
+
+from html import escape
+
+from htmlgen.generator import Generator, _render_frozen
+
+_MARKER = "\x00"
+_CHILD_SLOT = "c"
+_TEXT_SLOT = "t"
+
+
+def _check_name(name):
+    # Slot names are passed to Template.render() as keyword arguments.
+    # Requiring identifiers also keeps them free of characters that
+    # would be escaped when the template is compiled.
+    if not name.isidentifier():
+        raise ValueError("invalid slot name {!r}".format(name))
+
+
+class Slot(Generator):
+
+    """Placeholder for a string or sub-tree in a template.
+
+    Slots can be used wherever a tree accepts a generator:
+
+        >>> from htmlgen import Division, Paragraph
+        >>> division = Division(Paragraph(Slot("text")), Slot("footer"))
+        >>> template = compile_template(division)
+        >>> str(template.render(text="<Test>", footer=Paragraph("Footer")))
+        '<div><p>&lt;Test&gt;</p><p>Footer</p></div>'
+
+    Strings are HTML-escaped, generators are rendered. Slot names must
+    be valid Python identifiers.
+
+    """
+
+    __slots__ = ("name",)
+
+    def __init__(self, name):
+        _check_name(name)
+        super(Slot, self).__init__()
+        self.name = name
+
+    def generate(self):
+        yield _MARKER + _CHILD_SLOT + ":" + self.name + _MARKER
+
+
+class TextSlot(str):
+
+    """Placeholder for a string in a template.
+
+    Text slots can be used wherever a tree accepts a string, including
+    attribute values:
+
+        >>> from htmlgen import Link
+        >>> link = Link(TextSlot("url"), TextSlot("label"))
+        >>> template = compile_template(link)
+        >>> str(template.render(url="/?a=1&b=2", label="Home"))
+        '<a href="/?a=1&amp;b=2">Home</a>'
+
+    The values of text slots must be strings, which are HTML-escaped.
+
+    """
+
+    def __new__(cls, name):
+        _check_name(name)
+        slot = str.__new__(cls, _MARKER + _TEXT_SLOT + ":" + name + _MARKER)
+        slot.name = name
+        return slot
+
+
+class Template:
+
+    """A pre-rendered tree with slots.
+
+    Use compile_template() to create templates.
+
+    """
+
+    def __init__(self, segments, slots):
+        self.segments = segments
+        self.slots = slots
+        self.slot_names = frozenset(name for _, name in slots)
+
+    def render(self, **values):
+        """Return a generator that fills the slots with the given values.
+
+        A value must be given for every slot. Raise a TypeError if values
+        are missing or unknown.
+
+        """
+        names = set(values)
+        if names != self.slot_names:
+            missing = sorted(self.slot_names - names)
+            if missing:
+                raise TypeError("missing slot values: " + ", ".join(missing))
+            unknown = sorted(names - self.slot_names)
+            raise TypeError("unknown slots: " + ", ".join(unknown))
+        return TemplateGenerator(self, values)
+
+
+class TemplateGenerator(Generator):
+
+    """Generator returned by Template.render()."""
+
+    __slots__ = ("template", "values")
+
+    def __init__(self, template, values):
+        super(TemplateGenerator, self).__init__()
+        self.template = template
+        self.values = values
+
+    def generate(self):
+        values = self.values
+        segments = self.template.segments
+        yield segments[0]
+        for (kind, name), segment in zip(self.template.slots, segments[1:]):
+            value = values[name]
+            if kind == _TEXT_SLOT:
+                if not isinstance(value, str):
+                    raise TypeError(
+                        "value of text slot '{}' must be a string".format(name)
+                    )
+                yield escape(value, True)
+            elif hasattr(value, "generate"):
+                yield value
+            else:
+                yield escape(value, True)
+            yield segment
+
+
+def compile_template(generator):
+    """Render a tree containing slots into a Template.
+
+    All static elements, attributes, and strings in the tree are
+    rendered once. Use Slot and TextSlot to mark the dynamic parts. A
+    slot can appear several times in a template:
+
+        >>> from htmlgen import Division, Heading, Title
+        >>> division = Division(Title(TextSlot("title")))
+        >>> division.append(Heading(1, Slot("title")))
+        >>> template = compile_template(division)
+        >>> sorted(template.slot_names)
+        ['title']
+        >>> str(template.render(title="News"))
+        '<div><title>News</title><h1>News</h1></div>'
+
+    The tree can not contain htmlgen.Deferred elements or asynchronous
+    generators.
+
+    """
+    parts = _render_frozen(generator).split(_MARKER)
+    if len(parts) % 2 != 1:
+        raise ValueError("template contains NUL characters")
+    segments = parts[0::2]
+    slots = []
+    for spec in parts[1::2]:
+        kind, _, name = spec.partition(":")
+        if kind not in (_CHILD_SLOT, _TEXT_SLOT) or not name:
+            raise ValueError("template contains NUL characters")
+        slots.append((kind, name))
+    return Template(segments, slots)
@@ -0,0 +1,29 @@
+from typing import FrozenSet, List, Mapping, Tuple
+
+from htmlgen.generator import Generator, GenValue
+
+class Slot(Generator):
+    name: str
+    def __init__(self, name: str) -> None: ...
+
+class TextSlot(str):
+    name: str
+    def __new__(cls, name: str) -> TextSlot: ...
+
+class Template:
+    segments: List[str]
+    slots: List[Tuple[str, str]]
+    slot_names: FrozenSet[str]
+    def __init__(
+        self, segments: List[str], slots: List[Tuple[str, str]]
+    ) -> None: ...
+    def render(self, **values: GenValue) -> TemplateGenerator: ...
+
+class TemplateGenerator(Generator):
+    template: Template
+    values: Mapping[str, GenValue]
+    def __init__(
+        self, template: Template, values: Mapping[str, GenValue]
+    ) -> None: ...
+
+def compile_template(generator: GenValue) -> Template: ...
@@ -15,6 +15,8 @@ class Time(Element):
     '<time datetime="2014-05-17T13:15:00Z">May 17th, quarter past one</time>'
     """
 
+    __slots__ = ()
+
     def __init__(self, date):
         super().__init__("time")
         if hasattr(date, "hour"):
@@ -11,6 +11,8 @@ class Preload(Enum):
 
 
 class Video(Element):
+    __slots__ = ()
+
     controls = boolean_html_attribute("controls")
     poster = html_attribute("poster")
     preload = enum_attribute("preload", Preload)
@@ -0,0 +1,455 @@
+import os
+import subprocess
+import sys
+from tempfile import TemporaryDirectory
+from threading import Event, Thread
+from time import sleep, time
+from typing import List
+from unittest import TestCase
+
+from asserts import (
+    assert_equal,
+    assert_false,
+    assert_is_none,
+    assert_raises,
+    assert_true,
+)
+
+from htmlgen import (
+    CacheInfo,
+    Deferred,
+    DirectoryCache,
+    Division,
+    Element,
+    FragmentCache,
+    MemoizedGenerator,
+    Span,
+    memoize,
+)
+
+
+class FragmentCacheTest(TestCase):
+    def test_get_set(self):
+        cache = FragmentCache()
+        assert_is_none(cache.get("foo"))
+        cache.set("foo", "<p>Foo</p>")
+        assert_equal("<p>Foo</p>", cache.get("foo"))
+        assert_equal(1, len(cache))
+        assert_equal(10, cache.size)
+
+    def test_replace(self):
+        cache = FragmentCache()
+        cache.set("foo", "<p>Foo</p>")
+        cache.set("foo", "Bär")
+        assert_equal("Bär", cache.get("foo"))
+        assert_equal(1, len(cache))
+        assert_equal(4, cache.size)
+
+    def test_max_entries(self):
+        cache = FragmentCache(max_entries=2)
+        cache.set("a", "A")
+        cache.set("b", "B")
+        cache.get("a")
+        cache.set("c", "C")
+        assert_equal("A", cache.get("a"))
+        assert_is_none(cache.get("b"))
+        assert_equal("C", cache.get("c"))
+        assert_equal(2, len(cache))
+
+    def test_max_bytes(self):
+        cache = FragmentCache(max_bytes=10)
+        cache.set("a", "AAAA")
+        cache.set("b", "BBBB")
+        cache.set("c", "CCCC")
+        assert_is_none(cache.get("a"))
+        assert_equal("BBBB", cache.get("b"))
+        assert_equal("CCCC", cache.get("c"))
+        assert_equal(8, cache.size)
+
+    def test_too_large(self):
+        cache = FragmentCache(max_bytes=3)
+        cache.set("a", "AAAA")
+        assert_is_none(cache.get("a"))
+        assert_equal(0, cache.size)
+
+    def test_ttl(self):
+        cache = FragmentCache(ttl=0.05)
+        cache.set("a", "A")
+        assert_equal("A", cache.get("a"))
+        sleep(0.06)
+        assert_is_none(cache.get("a"))
+        assert_equal(0, len(cache))
+        assert_equal(0, cache.size)
+
+    def test_clear(self):
+        cache = FragmentCache()
+        cache.set("a", "A")
+        cache.clear()
+        assert_is_none(cache.get("a"))
+        assert_equal(0, cache.size)
+
+
+class DirectoryCacheTest(TestCase):
+    def setUp(self):
+        self._temp_dir = TemporaryDirectory()
+        self.path = self._temp_dir.name
+
+    def tearDown(self):
+        self._temp_dir.cleanup()
+
+    def _age(self, cache, key, seconds):
+        mtime = time() - seconds
+        os.utime(cache._file_name(key), (mtime, mtime))
+
+    def test_get_set(self):
+        cache = DirectoryCache(self.path)
+        assert_is_none(cache.get("foo"))
+        cache.set("foo", "<p>Bär</p>")
+        assert_equal("<p>Bär</p>".encode("utf-8"), cache.get("foo"))
+        assert_equal(1, len(cache))
+        assert_equal(11, cache.size)
+
+    def test_set_bytes(self):
+        cache = DirectoryCache(self.path)
+        cache.set("foo", b"<p>Foo</p>")
+        assert_equal(b"<p>Foo</p>", cache.get("foo"))
+
+    def test_empty_fragment(self):
+        cache = DirectoryCache(self.path)
+        cache.set("foo", "")
+        assert_equal(b"", cache.get("foo"))
+
+    def test_create_directory(self):
+        path = os.path.join(self.path, "sub", "dir")
+        DirectoryCache(path).set("foo", "Foo")
+        assert_equal(b"Foo", DirectoryCache(path).get("foo"))
+
+    def test_replace(self):
+        cache = DirectoryCache(self.path)
+        cache.set(("card", 1), "Foo")
+        cache.set(("card", 1), "Bar")
+        assert_equal(b"Bar", cache.get(("card", 1)))
+        assert_equal(1, len(cache))
+
+    def test_shared(self):
+        DirectoryCache(self.path).set("foo", "Foo")
+        assert_equal(b"Foo", DirectoryCache(self.path).get("foo"))
+
+    def test_other_process(self):
+        code = (
+            "import sys; from htmlgen import DirectoryCache; "
+            "DirectoryCache(sys.argv[1]).set(('card', 1), 'Foo')"
+        )
+        subprocess.run([sys.executable, "-c", code, self.path], check=True)
+        assert_equal(b"Foo", DirectoryCache(self.path).get(("card", 1)))
+
+    def test_max_entries(self):
+        cache = DirectoryCache(self.path, max_entries=2)
+        cache.set("a", "A")
+        self._age(cache, "a", 20)
+        cache.set("b", "B")
+        self._age(cache, "b", 10)
+        cache.get("a")
+        cache.set("c", "C")
+        assert_equal(b"A", cache.get("a"))
+        assert_is_none(cache.get("b"))
+        assert_equal(b"C", cache.get("c"))
+        assert_equal(2, len(cache))
+
+    def test_max_bytes(self):
+        cache = DirectoryCache(self.path, max_bytes=10)
+        cache.set("a", "AAAA")
+        self._age(cache, "a", 20)
+        cache.set("b", "BBBB")
+        self._age(cache, "b", 10)
+        cache.set("c", "CCCC")
+        assert_is_none(cache.get("a"))
+        assert_equal(b"BBBB", cache.get("b"))
+        assert_equal(8, cache.size)
+
+    def test_too_large(self):
+        cache = DirectoryCache(self.path, max_bytes=3)
+        cache.set("a", "AAAA")
+        assert_is_none(cache.get("a"))
+        assert_equal(0, len(cache))
+
+    def test_ttl(self):
+        cache = DirectoryCache(self.path, ttl=0.05)
+        cache.set("a", "A")
+        assert_equal(b"A", cache.get("a"))
+        sleep(0.06)
+        assert_is_none(cache.get("a"))
+        assert_equal(0, len(cache))
+
+    def test_clear(self):
+        cache = DirectoryCache(self.path)
+        cache.set("a", "A")
+        cache.set("b", "B")
+        cache.clear()
+        assert_is_none(cache.get("a"))
+        assert_equal(0, len(cache))
+
+    def test_no_temporary_files(self):
+        cache = DirectoryCache(self.path)
+        cache.set("a", "A")
+        assert_equal(1, len(os.listdir(self.path)))
+
+    def test_amortized_scans(self):
+        scans = []  # type: List[None]
+
+        class CountingCache(DirectoryCache):
+            def _scan(self, remove_stale=False):
+                scans.append(None)
+                return super()._scan(remove_stale)  # type: ignore
+
+        cache = CountingCache(self.path, max_entries=50)
+        for i in range(200):
+            cache.set(i, "x")
+            assert_true(len(os.listdir(self.path)) <= 50)
+        assert_true(len(scans) < 200 // 5 + 1)
+        assert_equal(b"x", cache.get(199))
+
+    def test_replace_counted_once(self):
+        cache = DirectoryCache(self.path, max_entries=20)
+        cache.set("a", "A")
+        for i in range(10):
+            cache.set("b", "B" * i)
+        assert_equal(b"A", cache.get("a"))
+        assert_equal(b"B" * 9, cache.get("b"))
+
+    def test_total_size_after_replace_and_evict(self):
+        cache = DirectoryCache(self.path, max_bytes=100)
+        cache.set("a", "A" * 10)
+        cache.set("a", "A" * 40)
+        cache.set("b", "B" * 40)
+        cache.set("c", "C" * 15)
+        cache.set("d", "D" * 10)
+        assert_equal(65, cache.size)
+        assert_equal(cache.size, cache._total)  # type: ignore
+        assert_is_none(cache.get("a"))
+        assert_equal(b"B" * 40, cache.get("b"))
+
+    def test_remove_stale_temporary_files(self):
+        stale_path = os.path.join(self.path, "stale.tmp")
+        fresh_path = os.path.join(self.path, "fresh.tmp")
+        for path in [stale_path, fresh_path]:
+            with open(path, "wb"):
+                pass
+        mtime = time() - 3600
+        os.utime(stale_path, (mtime, mtime))
+        DirectoryCache(self.path).set("a", "A")
+        assert_false(os.path.exists(stale_path))
+        assert_true(os.path.exists(fresh_path))
+
+    def test_memoize(self):
+        calls = []  # type: List[int]
+
+        @memoize(cache=DirectoryCache(self.path))
+        def card(id_):
+            calls.append(id_)
+            return Span(str(id_))
+
+        assert_equal("<span>1</span>", str(card(1)))
+        assert_equal("<div><span>1</span></div>", str(Division(card(1))))
+        assert_equal(b"<span>1</span>", b"".join(card(1)))
+        assert_equal([1], calls)
+        assert_equal(CacheInfo(2, 1, 1, 14), card.cache_info())
+
+
+class MemoizeTest(TestCase):
+    def test_function(self):
+        calls = []  # type: List[int]
+
+        @memoize
+        def card(id_):
+            calls.append(id_)
+            return Division(Span(str(id_)))
+
+        generator = card(1)
+        assert_true(isinstance(generator, MemoizedGenerator))
+        assert_equal([], calls)
+        assert_equal("<div><span>1</span></div>", str(generator))
+        assert_equal("<div><span>1</span></div>", str(card(1)))
+        assert_equal("<div><span>2</span></div>", str(card(2)))
+        assert_equal([1, 2], calls)
+
+    def test_class(self):
+        @memoize()
+        class Card(Element):
+            def __init__(self, title, *, css_class="card"):
+                super().__init__("div")
+                self.add_css_classes(css_class)
+                self.append(title)
+
+        assert_equal('<div class="card">&lt;A&gt;</div>', str(Card("<A>")))
+        assert_equal(
+            '<div class="big">A</div>', str(Card("A", css_class="big"))
+        )
+        info = Card.cache_info()  # type: ignore
+        assert_equal(CacheInfo(0, 2, 2, 57), info)
+        assert_true(issubclass(Card.__wrapped__, Element))  # type: ignore
+
+    def test_keyword_arguments(self):
+        @memoize
+        def card(a, b):
+            return Division(a, b)
+
+        str(card(a="1", b="2"))
+        str(card(b="2", a="1"))
+        assert_equal(1, card.cache_info().misses)
+        assert_equal(1, card.cache_info().hits)
+
+    def test_in_tree(self):
+        @memoize
+        def card(id_):
+            return Span(str(id_))
+
+        tree = Division(card(1), card(2), card(1))
+        assert_equal(
+            "<div><span>1</span><span>2</span><span>1</span></div>",
+            str(tree),
+        )
+        assert_equal(CacheInfo(1, 2, 2, 28), card.cache_info())
+
+    def test_custom_key(self):
+        @memoize(key=lambda product: product["id"])
+        def card(product):
+            return Span(product["name"])
+
+        assert_equal("<span>Foo</span>", str(card({"id": 1, "name": "Foo"})))
+        assert_equal("<span>Foo</span>", str(card({"id": 1, "name": "Bar"})))
+        assert_equal("<span>Baz</span>", str(card({"id": 2, "name": "Baz"})))
+
+    def test_shared_cache(self):
+        cache = FragmentCache()
+
+        @memoize(cache=cache)
+        def card1(id_):
+            return Span(str(id_))
+
+        @memoize(cache=cache)
+        def card2(id_):
+            return Division(str(id_))
+
+        assert_equal("<span>1</span>", str(card1(1)))
+        assert_equal("<div>1</div>", str(card2(1)))
+        assert_equal(2, len(cache))
+        assert_true(card1.cache is cache)
+
+    def test_max_entries(self):
+        @memoize(max_entries=1)
+        def card(id_):
+            return Span(str(id_))
+
+        str(card(1))
+        str(card(2))
+        str(card(1))
+        assert_equal(CacheInfo(0, 3, 1, 14), card.cache_info())
+
+    def test_ttl(self):
+        @memoize(ttl=0.05)
+        def card(id_):
+            return Span(str(id_))
+
+        str(card(1))
+        str(card(1))
+        sleep(0.06)
+        str(card(1))
+        assert_equal(CacheInfo(1, 2, 1, 14), card.cache_info())
+
+    def test_cache_clear(self):
+        @memoize
+        def card(id_):
+            return Span(str(id_))
+
+        str(card(1))
+        str(card(1))
+        card.cache_clear()
+        assert_equal(CacheInfo(0, 0, 0, 0), card.cache_info())
+
+    def test_exception(self):
+        fail = [True]
+
+        @memoize
+        def card(id_):
+            if fail[0]:
+                raise KeyError(id_)
+            return Span(str(id_))
+
+        with assert_raises(KeyError):
+            str(card(1))
+        fail[0] = False
+        assert_equal("<span>1</span>", str(card(1)))
+
+    def test_deferred(self):
+        @memoize
+        def card():
+            return Deferred("Slow")
+
+        with assert_raises(ValueError):
+            str(card())
+        assert_equal(0, len(card.cache))
+
+    def test_single_flight(self):
+        started = Event()
+        release = Event()
+        calls = []  # type: List[int]
+
+        @memoize
+        def card(id_):
+            calls.append(id_)
+            started.set()
+            assert_true(release.wait(5))
+            return Span(str(id_))
+
+        results = []  # type: List[str]
+
+        def render():
+            results.append(str(card(1)))
+
+        threads = [Thread(target=render) for _ in range(5)]
+        threads[0].start()
+        assert_true(started.wait(5))
+        for thread in threads[1:]:
+            thread.start()
+        sleep(0.05)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+        assert_equal(["<span>1</span>"] * 5, results)
+        assert_equal([1], calls)
+        assert_equal(CacheInfo(4, 1, 1, 14), card.cache_info())
+
+    def test_single_flight_failure(self):
+        started = Event()
+        release = Event()
+        calls = []  # type: List[int]
+
+        @memoize
+        def card(id_):
+            calls.append(id_)
+            if len(calls) == 1:
+                started.set()
+                assert_true(release.wait(5))
+                raise ValueError()
+            return Span(str(id_))
+
+        results = []  # type: List[str]
+
+        def render():
+            try:
+                results.append(str(card(1)))
+            except ValueError:
+                results.append("error")
+
+        leader = Thread(target=render)
+        leader.start()
+        assert_true(started.wait(5))
+        follower = Thread(target=render)
+        follower.start()
+        sleep(0.05)
+        release.set()
+        leader.join(5)
+        follower.join(5)
+        assert_false(leader.is_alive() or follower.is_alive())
+        assert_equal(["error", "<span>1</span>"], results)
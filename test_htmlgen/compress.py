@@ -0,0 +1,87 @@
+import gzip
+import zlib
+from unittest import TestCase
+
+from asserts import assert_equal, assert_greater, assert_raises
+
+from htmlgen import CompressedOutput, Division, RenderBudget
+from htmlgen.generator import IteratorGenerator
+
+
+def _rows(count):
+    rows = [Division("Row {}".format(i)) for i in range(count)]
+    return IteratorGenerator(rows)
+
+
+class CompressedOutputTest(TestCase):
+    def test_gzip(self):
+        output = CompressedOutput(_rows(1000))
+        assert_equal("gzip", output.content_encoding)
+        assert_equal(
+            _rows(1000).render_bytes(), gzip.decompress(b"".join(output))
+        )
+
+    def test_deflate(self):
+        output = CompressedOutput(_rows(1000), "deflate")
+        assert_equal("deflate", output.content_encoding)
+        assert_equal(
+            _rows(1000).render_bytes(), zlib.decompress(b"".join(output))
+        )
+
+    def test_unsupported_encoding(self):
+        with assert_raises(ValueError):
+            CompressedOutput(Division(), "br")
+
+    def test_empty(self):
+        output = CompressedOutput(IteratorGenerator([]))
+        assert_equal(b"", gzip.decompress(b"".join(output)))
+
+    def test_non_ascii(self):
+        output = CompressedOutput(IteratorGenerator(["ä", b"\xc3\x9f"]))
+        assert_equal(b"\xc3\xa4\xc3\x9f", gzip.decompress(b"".join(output)))
+
+    def test_iterate_twice(self):
+        output = CompressedOutput(_rows(10))
+        assert_equal(b"".join(output), b"".join(output))
+
+    def test_flush_points(self):
+        output = CompressedOutput(_rows(1000), flush_size=1000)
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        rendered = b""
+        chunks = list(output)
+        for chunk in chunks[:-1]:
+            rendered += decompressor.decompress(chunk)
+            assert_greater(len(rendered), 0)
+        rendered += decompressor.decompress(chunks[-1])
+        rendered += decompressor.flush()
+        assert_greater(len(chunks), 10)
+        assert_equal(_rows(1000).render_bytes(), rendered)
+
+    def test_without_flushing(self):
+        flushed = CompressedOutput(_rows(1000), flush_size=100)
+        unflushed = CompressedOutput(_rows(1000), flush_size=None)
+        data = b"".join(unflushed)
+        assert_equal(_rows(1000).render_bytes(), gzip.decompress(data))
+        assert_greater(len(b"".join(flushed)), len(data))
+        assert_greater(len(list(flushed)), len(list(unflushed)))
+
+    def test_max_delay(self):
+        output = CompressedOutput(_rows(100), max_delay=10)
+        data = b"".join(output)
+        assert_equal(_rows(100).render_bytes(), gzip.decompress(data))
+
+    def test_max_delay_without_flush_size(self):
+        with assert_raises(ValueError):
+            CompressedOutput(Division(), flush_size=None, max_delay=1)
+
+    def test_level(self):
+        fast = CompressedOutput(_rows(1000), level=0, flush_size=None)
+        best = CompressedOutput(_rows(1000), level=9, flush_size=None)
+        assert_greater(len(b"".join(fast)), len(b"".join(best)))
+
+    def test_budget(self):
+        budget = RenderBudget(max_nodes=2, fallback="Too large")
+        output = CompressedOutput(_rows(1000), budget=budget)
+        assert_equal(
+            b"<div>Row 0</div>Too large", gzip.decompress(b"".join(output))
+        )
@@ -0,0 +1,113 @@
+import asyncio
+import re
+from unittest import TestCase
+
+from asserts import assert_equal, assert_regex
+
+from htmlgen import Body, Deferred, Division, Document, Span
+from htmlgen.generator import ChildGenerator, DeferredOutlet
+
+_SCRIPT = "<script>[^<]*</script>"
+
+
+class DeferredTest(TestCase):
+    def test_placeholder_and_content(self):
+        body = Body()
+        body.append(Deferred(Division("Slow"), "Loading..."))
+        body.append(Division("Fast"))
+        assert_regex(
+            str(body),
+            "^<body>"
+            + re.escape('<div data-htmlgen-deferred="0">Loading...</div>')
+            + re.escape("<div>Fast</div>")
+            + re.escape('<template data-htmlgen-deferred="0">')
+            + re.escape("<div>Slow</div></template>")
+            + _SCRIPT
+            + "</body>$",
+        )
+
+    def test_script(self):
+        output = str(Deferred("Slow"))
+        assert_regex(output, r'\[data-htmlgen-deferred=\\?"0\\?"\]')
+        assert_regex(output, r"replaceWith\(t\.content\)")
+
+    def test_escape_string_content(self):
+        output = str(Deferred("<Slow>"))
+        assert_regex(output, "<template[^>]*>&lt;Slow&gt;</template>")
+
+    def test_attributes_and_element_name(self):
+        deferred = Deferred("Slow", Span("..."), element_name="p")
+        deferred.add_css_classes("loading")
+        assert_regex(
+            str(deferred),
+            "^"
+            + re.escape(
+                '<p class="loading" data-htmlgen-deferred="0">'
+                "<span>...</span></p>"
+            ),
+        )
+
+    def test_multiple_and_nested(self):
+        body = Body()
+        body.append(Deferred(Deferred("Inner", "P2"), "P1"))
+        body.append(Deferred("Other", "P3"))
+        assert_regex(
+            str(body),
+            "^<body>"
+            + re.escape('<div data-htmlgen-deferred="0">P1</div>')
+            + re.escape('<div data-htmlgen-deferred="1">P3</div>')
+            + re.escape('<template data-htmlgen-deferred="0">')
+            + re.escape('<div data-htmlgen-deferred="2">P2</div></template>')
+            + _SCRIPT
+            + re.escape('<template data-htmlgen-deferred="1">Other</template>')
+            + _SCRIPT
+            + re.escape('<template data-htmlgen-deferred="2">Inner</template>')
+            + _SCRIPT
+            + "</body>$",
+        )
+
+    def test_document(self):
+        doc = Document()
+        doc.append_body(Deferred("Slow"))
+        assert_regex(str(doc), "</template>" + _SCRIPT + "</body></html>$")
+
+    def test_outside_of_body(self):
+        generator = ChildGenerator()
+        generator.extend([Deferred("Slow"), "Fast"])
+        assert_regex(
+            str(generator),
+            "^"
+            + re.escape('<div data-htmlgen-deferred="0"></div>Fast')
+            + re.escape('<template data-htmlgen-deferred="0">Slow</template>')
+            + _SCRIPT
+            + "$",
+        )
+
+    def test_explicit_outlet(self):
+        generator = ChildGenerator()
+        generator.extend([Deferred("Slow"), DeferredOutlet(), "Fast"])
+        assert_regex(str(generator), "</script>Fast$")
+
+    def test_render_twice(self):
+        deferred = Deferred("Slow")
+        assert_equal(str(deferred), str(deferred))
+
+    def test_aiter(self):
+        class SlowGenerator(Division):
+            async def generate_children(self):
+                await asyncio.sleep(0)
+                yield "Slow"
+
+        body = Body()
+        body.extend([Deferred(SlowGenerator()), "Fast"])
+
+        async def render():
+            return b"".join([s async for s in body.aiter()])
+
+        output = asyncio.run(render()).decode("utf-8")
+        assert_regex(
+            output,
+            re.escape("</div>Fast<template")
+            + "[^>]*"
+            + re.escape("><div>Slow</div></template>"),
+        )
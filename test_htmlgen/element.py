@@ -1,15 +1,46 @@
+import gc
 import re
 from unittest import TestCase
+from weakref import ref
 
 from asserts import (
     assert_false,
     assert_true,
     assert_equal,
+    assert_is,
     assert_is_none,
     assert_raises,
 )
 
+import htmlgen
+from htmlgen import (
+    Deferred,
+    Division,
+    Document,
+    RenderBudget,
+    RenderProfiler,
+    Span,
+    html_attribute,
+)
 from htmlgen.element import Element, VoidElement, NonVoidElement
+from htmlgen.generator import (
+    Generator,
+    HTMLChildGenerator,
+    IteratorGenerator,
+)
+
+
+class _CountingElement(Element):
+    def __init__(self, element_name, *children):
+        super().__init__(element_name)
+        self.extend(children)
+        self.renders = 0
+
+    def render_start_tag(self):
+        self.renders += 1
+        return super().render_start_tag()
+
+    title = html_attribute("title")
 
 
 class NonVoidElementTest(TestCase):
@@ -254,6 +285,126 @@ class ElementTest(TestCase):
         element.data = {}  # type: ignore
         assert_is_none(element.get_attribute("data-old"))
 
+    def test_containers_allocated_lazily(self):
+        element = Element("div")
+        element.remove_attribute("foo")
+        element.remove_css_classes("foo")
+        assert_false(element.has_css_class("foo"))
+        assert_is_none(element.get_attribute("foo"))
+        assert_equal(set(), element.attribute_names)
+        assert_equal(0, len(element))
+        assert_equal("<div></div>", str(element))
+        assert_is_none(element._attributes)  # type: ignore
+        assert_is_none(element._css_classes)  # type: ignore
+        assert_is_none(element._styles)  # type: ignore
+        assert_is_none(element._children)  # type: ignore
+
+    def test_unknown_attribute(self):
+        element = Element("div")
+        with assert_raises(AttributeError):
+            element.apend("Test")  # type: ignore
+        assert_is_none(element._children)  # type: ignore
+
+    def test_empty_without_children(self):
+        element = Element("div")
+        element.empty()
+        assert_equal("<div></div>", str(element))
+
+    def test_remove_without_children(self):
+        element = Element("div")
+        with assert_raises(ValueError):
+            element.remove("foo")
+        with assert_raises(ValueError):
+            element.remove_raw("foo")
+
+    def test_remove_attribute_unhashable_name(self):
+        element = Element("div")
+        element.set_attribute("foo", "bar")
+        with assert_raises(TypeError):
+            element.remove_attribute([])  # type: ignore
+
+    def test_rendering_does_not_allocate_children(self):
+        from htmlgen import Body, Select, Table
+
+        elements = [
+            Body(),
+            Table(),
+            Deferred("Slow", element_name="span"),
+            Element("div"),
+        ]
+        for element in elements:
+            str(element)
+            assert_is_none(element._children)  # type: ignore
+        select = Select()
+        assert_is_none(select.selected_option)
+        assert_is_none(select._children)  # type: ignore
+
+    def test_render_cache_stays_valid(self):
+        from htmlgen import Table
+
+        element = _CountingElement("div", Table())
+        element.enable_render_cache()
+        str(element)
+        str(element)
+        assert_equal(1, element.renders)
+
+    def test_replace_children(self):
+        element = Element("div")
+        children = HTMLChildGenerator()
+        children.append("<foo>")
+        element.children = children
+        assert_equal("<div>&lt;foo&gt;</div>", str(element))
+
+
+class GarbageCollectionTest(TestCase):
+    def setUp(self):
+        gc.collect()
+        gc.disable()
+
+    def tearDown(self):
+        gc.enable()
+
+    def test_tree_freed_without_cyclic_gc(self):
+        child = Element("span")
+        child.data["foo"] = "bar"
+        child.add_css_classes("baz")
+        child.append("Test")
+        element = Element("div")
+        element.id = "element"
+        element.set_style("color", "red")
+        element.append(child)
+        element.append(VoidElement("br"))
+        str(element)
+        child_ref = ref(child)
+        element_ref = ref(element)
+        del child, element
+        assert_is_none(child_ref())
+        assert_is_none(element_ref())
+
+    def test_cached_tree_freed_without_cyclic_gc(self):
+        child = Element("span")
+        child.enable_render_cache()
+        element = Element("div")
+        element.append(child)
+        element.enable_render_cache()
+        str(element)
+        child_ref = ref(child)
+        element_ref = ref(element)
+        del child, element
+        assert_is_none(child_ref())
+        assert_is_none(element_ref())
+
+    def test_document_freed_without_cyclic_gc(self):
+        doc = Document(title="Test")
+        doc.add_stylesheet("style.css")
+        doc.append_body(Deferred("Slow", "Loading..."))
+        str(doc)
+        doc_ref = ref(doc)
+        body_ref = ref(doc.root.body)
+        del doc
+        assert_is_none(doc_ref())
+        assert_is_none(body_ref())
+
 
 class ShortElementTest(TestCase):
     def test_empty(self):
@@ -264,3 +415,300 @@ class ShortElementTest(TestCase):
         element = VoidElement("br")
         element.set_attribute("data-foo", "bar")
         assert_equal([b'<br data-foo="bar"/>'], list(iter(element)))
+
+
+class SlotsTest(TestCase):
+    def test_no_instance_dict(self):
+        for name, cls in vars(htmlgen).items():
+            if isinstance(cls, type) and issubclass(cls, Generator):
+                assert_equal(0, cls.__dictoffset__, name)
+
+    def test_unknown_attribute(self):
+        element = VoidElement("br")
+        with assert_raises(AttributeError):
+            element.foo = "bar"  # type: ignore
+
+    def test_sub_class_attributes(self):
+        class MyElement(Element):
+            def __init__(self):
+                super().__init__("div")
+                self.foo = "bar"
+
+        element = MyElement()
+        assert_equal("bar", element.foo)
+        assert_equal("<div></div>", str(element))
+
+    def test_weak_reference(self):
+        element = Element("div")
+        assert_is(element, ref(element)())
+
+
+class RenderCacheTest(TestCase):
+    def test_disabled_by_default(self):
+        element = Element("div")
+        assert_false(element.render_cache_enabled)
+        element.enable_render_cache()
+        assert_true(element.render_cache_enabled)
+        element.disable_render_cache()
+        assert_false(element.render_cache_enabled)
+
+    def test_cached(self):
+        child = _CountingElement("span", "Test")
+        element = _CountingElement("div", child, VoidElement("br"))
+        element.enable_render_cache()
+        assert_equal("<div><span>Test</span><br/></div>", str(element))
+        assert_equal(
+            [b"<div><span>Test</span><br/></div>"], list(iter(element))
+        )
+        assert_equal(1, element.renders)
+        assert_equal(1, child.renders)
+
+    def test_not_cached(self):
+        element = _CountingElement("div")
+        str(element)
+        str(element)
+        assert_equal(2, element.renders)
+
+    def test_disable(self):
+        element = _CountingElement("div")
+        element.enable_render_cache()
+        str(element)
+        element.disable_render_cache()
+        str(element)
+        assert_equal(2, element.renders)
+
+    def test_void_element(self):
+        element = VoidElement("br")
+        element.enable_render_cache()
+        assert_equal("<br/>", str(element))
+        element.set_attribute("foo", "bar")
+        assert_equal('<br foo="bar"/>', str(element))
+
+    def test_invalidate_on_element_changes(self):
+        changes = [
+            lambda e: e.set_attribute("foo", "bar"),
+            lambda e: e.remove_attribute("foo"),
+            lambda e: e.add_css_classes("foo"),
+            lambda e: e.remove_css_classes("foo"),
+            lambda e: e.set_style("color", "red"),
+            lambda e: e.data.__setitem__("foo", "bar"),
+            lambda e: e.data.clear(),
+            lambda e: setattr(e, "id", "foo"),
+            lambda e: setattr(e, "title", "Foo"),
+            lambda e: e.append("foo"),
+            lambda e: e.extend(["foo", "bar"]),
+            lambda e: e.append_raw("<br>"),
+            lambda e: e.extend_raw(["<br>"]),
+            lambda e: e.remove("foo"),
+            lambda e: e.remove_raw("<br>"),
+            lambda e: e.children.append("baz"),
+            lambda e: e.empty(),
+        ]
+        element = _CountingElement("div")
+        element.enable_render_cache()
+        for change in changes:
+            str(element)
+            change(element)
+            expected = str(_copy(element))
+            assert_equal(expected, str(element))
+
+    def test_unchanged_attribute_removal(self):
+        element = _CountingElement("div")
+        element.enable_render_cache()
+        str(element)
+        element.remove_attribute("foo")
+        str(element)
+        assert_equal(1, element.renders)
+
+    def test_unchanged_css_class_removal(self):
+        element = _CountingElement("div")
+        element.enable_render_cache()
+        str(element)
+        element.remove_css_classes("foo")
+        element.add_css_classes("bar")
+        str(element)
+        element.remove_css_classes("foo")
+        str(element)
+        assert_equal(2, element.renders)
+        element.remove_css_classes("bar")
+        assert_equal("<div></div>", str(element))
+
+    def test_invalidate_from_descendant(self):
+        grandchild = Element("span")
+        child = Element("p")
+        child.append(grandchild)
+        element = Element("div")
+        element.append(child)
+        element.enable_render_cache()
+        str(element)
+        grandchild.append("Test")
+        assert_equal("<div><p><span>Test</span></p></div>", str(element))
+        grandchild.set_attribute("foo", "bar")
+        assert_equal(
+            '<div><p><span foo="bar">Test</span></p></div>', str(element)
+        )
+
+    def test_invalidate_on_first_child(self):
+        child = Element("span")
+        element = Element("div")
+        element.append(child)
+        element.enable_render_cache()
+        str(element)
+        child.append("Test")
+        assert_equal("<div><span>Test</span></div>", str(element))
+        empty_element = Element("div")
+        empty_element.enable_render_cache()
+        str(empty_element)
+        empty_element.append("Test")
+        assert_equal("<div>Test</div>", str(empty_element))
+
+    def test_invalidate_on_stock_element_state(self):
+        from htmlgen import HTMLRoot, Head, Script
+
+        head = Head(title="A")
+        head.enable_render_cache()
+        str(head)
+        head.title.title = "B"
+        assert_true("<title>B</title>" in str(head))
+        script = Script(script="a();")
+        script.enable_render_cache()
+        str(script)
+        script.script = "b();"
+        assert_true("b();" in str(script))
+        root = HTMLRoot(title="A")
+        root.enable_render_cache()
+        str(root)
+        root.head = Head(title="C")
+        assert_true("<title>C</title>" in str(root))
+
+    def test_nested_caches(self):
+        rows = [_CountingElement("tr", str(i)) for i in range(3)]
+        for row in rows:
+            row.enable_render_cache()
+        table = _CountingElement("table", *rows)
+        table.enable_render_cache()
+        str(table)
+        rows[1].append("x")
+        assert_equal(
+            "<table><tr>0</tr><tr>1x</tr><tr>2</tr></table>", str(table)
+        )
+        assert_equal(2, table.renders)
+        assert_equal([1, 2, 1], [row.renders for row in rows])
+
+    def test_nested_caches_invalidate_from_descendant(self):
+        child = Element("span")
+        row = Element("tr")
+        row.append(child)
+        row.enable_render_cache()
+        table = Element("table")
+        table.append(row)
+        table.enable_render_cache()
+        str(table)
+        str(table)
+        child.append("x")
+        assert_equal("<table><tr><span>x</span></tr></table>", str(table))
+
+    def test_shared_child(self):
+        child = Element("span")
+        element1 = Element("div")
+        element1.append(child)
+        element1.enable_render_cache()
+        element2 = Element("p")
+        element2.append(child)
+        element2.enable_render_cache()
+        str(element1)
+        str(element2)
+        child.append("x")
+        assert_equal("<div><span>x</span></div>", str(element1))
+        assert_equal("<p><span>x</span></p>", str(element2))
+
+    def test_child_generator_changes(self):
+        items = ["foo"]
+        element = Element("div")
+        element.append(IteratorGenerator(items))
+        element.enable_render_cache()
+        assert_equal("<div>foo</div>", str(element))
+        items[0] = "bar"
+        assert_equal("<div>foo</div>", str(element))
+        element.invalidate_render_cache()
+        assert_equal("<div>bar</div>", str(element))
+
+    def test_invalidate_ancestors_manually(self):
+        items = ["foo"]
+        child = Element("span")
+        child.append(IteratorGenerator(items))
+        element = Element("div")
+        element.append(child)
+        element.enable_render_cache()
+        str(element)
+        items[0] = "bar"
+        child.invalidate_render_cache()
+        assert_equal("<div><span>bar</span></div>", str(element))
+
+    def test_change_while_rendering(self):
+        element = Element("div")
+
+        class ChangingGenerator(Generator):
+            def generate(self):
+                element.set_attribute("foo", "bar")
+                yield "x"
+
+        element.append(ChangingGenerator())
+        element.enable_render_cache()
+        assert_equal("<div>x</div>", str(element))
+        assert_equal('<div foo="bar">x</div>', str(element))
+
+    def test_deferred_not_cached(self):
+        element = Element("div")
+        element.append(Deferred("Slow"))
+        element.enable_render_cache()
+        assert_equal(str(element), str(element))
+        assert_true("Slow" in str(element))
+
+    def test_budget(self):
+        element = Element("div")
+        element.extend([Element("span") for _ in range(5)])
+        element.enable_render_cache()
+        wrapper = Element("section")
+        wrapper.append(element)
+        budget = RenderBudget(max_nodes=3, fallback="Fallback")
+        assert_equal("<section>Fallback</section>", wrapper.render_str(budget))
+        assert_equal(
+            "<section><div>" + "<span></span>" * 5 + "</div></section>",
+            wrapper.render_str(),
+        )
+        assert_equal(
+            "<section><div>" + "<span></span>" * 5 + "</div></section>",
+            wrapper.render_str(budget),
+        )
+
+    def test_budget_same_when_filling_cache(self):
+        for max_nodes in [1, 3, 4]:
+            inner = Division(Span())
+            budget = RenderBudget(max_nodes=max_nodes, fallback="F")
+            expected = Division(inner).render_str(budget)
+            inner.enable_render_cache()
+            assert_equal(expected, Division(inner).render_str(budget))
+
+    def test_profiler(self):
+        child = _CountingElement("span")
+        element = _CountingElement("div", child)
+        element.enable_render_cache()
+        str(element)
+        with RenderProfiler() as profiler:
+            assert_equal("<div><span></span></div>", str(element))
+        profile = profiler.get_profile(_CountingElement)
+        assert profile is not None
+        assert_equal(1, profile.count)
+        assert_equal(1, element.renders)
+
+
+def _copy(element):
+    copy = Element(element.element_name)
+    for name in element.attribute_names:
+        copy.set_attribute(name, element.get_attribute(name))
+    copy.add_css_classes(*(element._css_classes or ()))
+    for name, value in (element._styles or {}).items():
+        copy.set_style(name, value)
+    copy.extend_raw(element.children.children)
+    return copy
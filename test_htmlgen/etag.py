@@ -0,0 +1,105 @@
+import hashlib
+from unittest import TestCase
+
+from asserts import assert_equal, assert_false, assert_raises, assert_true
+
+from htmlgen import Division, HashedOutput, RenderBudget, etag_matches
+from htmlgen.generator import IteratorGenerator
+
+
+def _rows(count):
+    rows = [Division("Röw {}".format(i)) for i in range(count)]
+    return IteratorGenerator(rows)
+
+
+class HashedOutputTest(TestCase):
+    def test_output(self):
+        output = HashedOutput(_rows(1000))
+        assert_equal(_rows(1000).render_bytes(), b"".join(output))
+
+    def test_hash(self):
+        output = HashedOutput(_rows(1000))
+        data = b"".join(output)
+        assert_true(output.complete)
+        assert_equal(hashlib.sha256(data).digest(), output.digest())
+        assert_equal(hashlib.sha256(data).hexdigest(), output.hexdigest())
+        assert_equal('"' + output.hexdigest() + '"', output.etag)
+
+    def test_algorithm(self):
+        output = HashedOutput(Division(), "md5")
+        list(output)
+        expected = hashlib.md5(b"<div></div>").hexdigest()
+        assert_equal(expected, output.hexdigest())
+
+    def test_unknown_algorithm(self):
+        with assert_raises(ValueError):
+            HashedOutput(Division(), "unknown")
+
+    def test_independent_of_chunking(self):
+        small = HashedOutput(_rows(100), min_size=1)
+        large = HashedOutput(_rows(100), min_size=100000)
+        assert_true(len(list(small)) > len(list(large)))
+        assert_equal(small.etag, large.etag)
+
+    def test_stable(self):
+        output1 = HashedOutput(_rows(10))
+        output2 = HashedOutput(_rows(10))
+        list(output1)
+        list(output2)
+        assert_equal(output1.etag, output2.etag)
+
+    def test_changed_output(self):
+        output1 = HashedOutput(_rows(10))
+        output2 = HashedOutput(_rows(11))
+        list(output1)
+        list(output2)
+        assert_true(output1.etag != output2.etag)
+
+    def test_incomplete(self):
+        output = HashedOutput(IteratorGenerator(["foo", "bar"]), min_size=1)
+        assert_false(output.complete)
+        with assert_raises(ValueError):
+            output.etag
+        iterator = iter(output)
+        next(iterator)
+        assert_false(output.complete)
+        with assert_raises(ValueError):
+            output.hexdigest()
+        list(iterator)
+        assert_true(output.complete)
+
+    def test_iterate_again(self):
+        output = HashedOutput(_rows(10), min_size=1)
+        list(output)
+        etag = output.etag
+        iterator = iter(output)
+        next(iterator)
+        assert_false(output.complete)
+        list(iterator)
+        assert_equal(etag, output.etag)
+
+    def test_budget(self):
+        budget = RenderBudget(max_nodes=1, fallback="Fallback")
+        output = HashedOutput(_rows(10), budget=budget)
+        assert_equal(b"Fallback", b"".join(output))
+        expected = hashlib.sha256(b"Fallback").hexdigest()
+        assert_equal(expected, output.hexdigest())
+
+
+class ETagMatchesTest(TestCase):
+    def test_match(self):
+        assert_true(etag_matches('"abc"', '"abc"'))
+
+    def test_no_match(self):
+        assert_false(etag_matches('"abc"', '"abd"'))
+
+    def test_list(self):
+        assert_true(etag_matches('"foo", "abc" , "bar"', '"abc"'))
+        assert_false(etag_matches('"foo", "bar"', '"abc"'))
+
+    def test_weak(self):
+        assert_true(etag_matches('W/"abc"', '"abc"'))
+        assert_true(etag_matches('"abc"', 'W/"abc"'))
+
+    def test_any(self):
+        assert_true(etag_matches(" * ", '"abc"'))
@@ -1,18 +1,40 @@
 # -*- coding: utf-8 -*-
 
+import asyncio
+from concurrent.futures import Future, ThreadPoolExecutor
+from io import BytesIO
+from threading import Event, Thread
+from time import monotonic, sleep
+from typing import AsyncIterator, List
 from unittest import TestCase
 
-from asserts import assert_equal, assert_raises, assert_is_instance, assert_is
+from asserts import (
+    assert_equal,
+    assert_raises,
+    assert_is_instance,
+    assert_is,
+    assert_is_not,
+    assert_true,
+)
 
+from htmlgen.element import Element, NonVoidElement, VoidElement
 from htmlgen.generator import (
     Generator,
     NullGenerator,
+    RenderContext,
+    RenderBudget,
+    RenderBudgetExceeded,
     IteratorGenerator,
+    FutureGenerator,
+    FrozenGenerator,
     ChildGenerator,
     HTMLChildGenerator,
     JoinGenerator,
     HTMLJoinGenerator,
     generate_html_string,
+    frozen,
+    InternTable,
+    interned,
 )
 
 
@@ -55,6 +77,15 @@ class GeneratorTest(TestCase):
         generator = _TestingGenerator([inner2, u"baz"])
         assert_equal([b"foo", b"bar", b"baz"], list(iter(generator)))
 
+    def test_generate_returns_sequence(self):
+        class ListGenerator(Generator):
+            def generate(self):
+                return [_TestingGenerator(["foo"]), "bar"]
+
+        generator = _TestingGenerator([ListGenerator(), "baz"])
+        assert_equal("foobarbaz", str(generator))
+        assert_equal("foobar", str(ListGenerator()))
+
     def test_str(self):
         inner = _TestingGenerator([u"bar"])
         generator = _TestingGenerator([u"foo", inner, u"baz"])
@@ -65,6 +96,523 @@ class GeneratorTest(TestCase):
         with assert_raises(TypeError):
             str(generator)
 
+    def test_render_str(self):
+        inner = _TestingGenerator([b"b\xc3\xa4r"])
+        generator = _TestingGenerator(["foo", inner, "baz"])
+        assert_equal("foobärbaz", generator.render_str())
+
+    def test_render_bytes(self):
+        inner = _TestingGenerator([b"b\xe4r"])
+        generator = _TestingGenerator(["foo", "ß", inner, "baz"])
+        assert_equal(b"foo\xc3\x9fb\xe4rbaz", generator.render_bytes())
+
+    def test_render_bytes_strings_only(self):
+        generator = _TestingGenerator(["foo", "bar"])
+        assert_equal(b"foobar", generator.render_bytes())
+
+    def test_iter_chunks(self):
+        generator = _TestingGenerator(["foo", b"bar", "baz", "x"])
+        chunks = list(generator.iter_chunks(min_size=4))
+        assert_equal([b"foobar", b"bazx"], chunks)
+
+    def test_iter_chunks_non_ascii(self):
+        generator = _TestingGenerator(["fooß", "bär"])
+        chunks = list(generator.iter_chunks(min_size=100))
+        assert_equal([b"foo\xc3\x9fb\xc3\xa4r"], chunks)
+
+    def test_iter_chunks_empty(self):
+        generator = _TestingGenerator([])
+        assert_equal([], list(generator.iter_chunks()))
+
+    def test_iter_chunks_max_delay(self):
+        class SlowGenerator(Generator):
+            def generate(self):
+                yield "foo"
+                sleep(0.5)
+                yield "bar"
+
+        start = monotonic()
+        chunks = SlowGenerator().iter_chunks(max_delay=0.05)
+        assert_equal(b"foo", next(chunks))
+        assert_true(monotonic() - start < 0.4)
+        assert_equal([b"bar"], list(chunks))
+
+    def test_iter_chunks_max_delay_fast(self):
+        generator = _TestingGenerator(["foo", "bar", "baz"])
+        chunks = list(generator.iter_chunks(min_size=6, max_delay=10))
+        assert_equal([b"foobar", b"baz"], chunks)
+
+    def test_iter_chunks_max_delay_exception(self):
+        generator = _TestingGenerator(["foo", 5])
+        with assert_raises(TypeError):
+            list(generator.iter_chunks(max_delay=10))
+
+    def test_iter_chunks_max_delay_close(self):
+        finished = Event()
+
+        class EndlessGenerator(Generator):
+            def generate(self):
+                try:
+                    while True:
+                        yield "x"
+                finally:
+                    finished.set()
+
+        chunks = EndlessGenerator().iter_chunks(min_size=10, max_delay=10)
+        assert_equal(b"x" * 10, next(chunks))
+        chunks.close()
+        assert_true(finished.wait(5))
+
+    def test_write_to(self):
+        inner = _TestingGenerator([b"b\xc3\xa4r"])
+        generator = _TestingGenerator(["foo", "ß", inner, "baz"])
+        stream = BytesIO()
+        generator.write_to(stream)
+        assert_equal(b"foo\xc3\x9fb\xc3\xa4rbaz", stream.getvalue())
+
+    def test_write_to_batches(self):
+        class RecordingWriter:
+            def __init__(self):
+                self.calls = []  # type: List[List[bytes]]
+
+            def writelines(self, lines):
+                self.calls.append(lines)
+
+        generator = _TestingGenerator(["foo", "bar", b"baz", "x", "y"])
+        writer = RecordingWriter()
+        generator.write_to(writer, batch_size=6)
+        assert_equal([[b"foobar"], [b"baz", b"xy"]], writer.calls)
+
+    def test_measure(self):
+        inner = _TestingGenerator([b"b\xc3\xa4r", "\U0001f600"])
+        generator = _TestingGenerator(["foo", "ß", inner, ""])
+        assert_equal(len(generator.render_bytes()), generator.measure())
+        assert_equal(13, generator.measure())
+
+    def test_measure_elements(self):
+        element = Element("div")
+        element.set_attribute("title", "<ä>")
+        element.append(Element("span"))
+        element.append(VoidElement("br"))
+        element.append("Foo & Bär")
+        assert_equal(len(element.render_bytes()), element.measure())
+
+    def test_measure_budget(self):
+        generator = _TestingGenerator(["foo", "bär", "baz"])
+        budget = RenderBudget(max_bytes=5, fallback="...")
+        size = generator.measure(budget)
+        assert_equal(len(generator.render_bytes(budget)), size)
+        with assert_raises(RenderBudgetExceeded):
+            generator.measure(RenderBudget(max_bytes=5))
+
+    def test_measure_empty(self):
+        assert_equal(0, NullGenerator().measure())
+
+    def test_iterate_while_iterating(self):
+        inner = _TestingGenerator(["bar"])
+        generator = _TestingGenerator(["foo", inner, "baz"])
+        iterator = iter(generator)
+        assert_equal(b"foo", next(iterator))
+        assert_equal("foobarbaz", str(generator))
+        assert_equal([b"bar", b"baz"], list(iterator))
+
+    def test_render_nested_in_itself(self):
+        class NestingGenerator(Generator):
+            def __init__(self, shared):
+                self._shared = shared
+
+            def generate(self):
+                yield "<"
+                yield str(self._shared)
+                yield ">"
+
+        shared = _TestingGenerator(["x"])
+        shared._items.append(NestingGenerator(_TestingGenerator(["y"])))
+        generator = _TestingGenerator([shared, NestingGenerator(shared)])
+        assert_equal("x<y><x<y>>", str(generator))
+
+    def test_render_from_multiple_threads(self):
+        rows = [_TestingGenerator(["<", str(i), ">"]) for i in range(100)]
+        shared = _TestingGenerator(rows)
+        expected = str(shared)
+        results = []  # type: List[str]
+
+        def render():
+            for _ in range(20):
+                results.append(str(shared))
+
+        threads = [Thread(target=render) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert_equal([expected] * 80, results)
+
+
+class RenderContextTest(TestCase):
+    def test_native_items(self):
+        inner = _TestingGenerator([b"bar"])
+        generator = _TestingGenerator(["foo", inner])
+        assert_equal(["foo", b"bar"], list(RenderContext(generator)))
+
+    def test_root(self):
+        generator = _TestingGenerator([])
+        assert_is(generator, RenderContext(generator).root)
+
+    def test_elements(self):
+        element = Element("div")
+        element.set_attribute("id", "x")
+        element.append("<")
+        element.append(VoidElement("br"))
+        sub_element = Element("span")
+        sub_element.append_raw("&amp;")
+        element.append(sub_element)
+        assert_equal(
+            ['<div id="x">', "&lt;", "<br/>", "<span>", "&amp;", "</span>"]
+            + ["</div>"],
+            list(RenderContext(element)),
+        )
+
+    def test_child_generators(self):
+        children = ChildGenerator()
+        children.append("<")
+        html_children = HTMLChildGenerator()
+        html_children.append("<")
+        html_children.append(children)
+        assert_equal(["&lt;", "<"], list(RenderContext(html_children)))
+
+    def test_overridden_generate(self):
+        class MyElement(Element):
+            def generate(self):
+                yield "custom"
+
+        class MyVoidElement(VoidElement):
+            def generate(self):
+                yield "void"
+
+        class MyChildGenerator(HTMLChildGenerator):
+            def generate(self):
+                yield "children"
+
+        element = Element("div")
+        element.extend([MyElement("p"), MyVoidElement("br")])
+        element.append(MyChildGenerator())
+        assert_equal(
+            ["<div>", "custom", "void", "children", "</div>"],
+            list(RenderContext(element)),
+        )
+
+    def test_overridden_generate_children(self):
+        class MyElement(Element):
+            def generate_children(self):
+                yield "custom"
+
+        class MyNonVoidElement(NonVoidElement):
+            def generate_children(self):
+                yield Element("br")
+
+        assert_equal(
+            ["<p>", "custom", "</p>"], list(RenderContext(MyElement("p")))
+        )
+        assert_equal(
+            ["<x>", "<br>", "</br>", "</x>"],
+            list(RenderContext(MyNonVoidElement("x"))),
+        )
+
+    def test_overridden_render_start_tag(self):
+        class MyElement(Element):
+            def render_start_tag(self):
+                return "<custom"
+
+        assert_equal(["<custom>", "</p>"], list(RenderContext(MyElement("p"))))
+
+    def test_replaced_children(self):
+        element = Element("div")
+        element.children = _TestingGenerator(["<foo>"])  # type: ignore
+        assert_equal(
+            ["<div>", "<foo>", "</div>"], list(RenderContext(element))
+        )
+
+    def test_defer(self):
+        context = RenderContext(ChildGenerator())
+        assert_equal("0", context.defer("foo"))
+        assert_equal("1", context.defer("bar"))
+        assert_equal(
+            [("0", "foo"), ("1", "bar")], list(context.iter_deferred())
+        )
+        assert_equal([], list(context.iter_deferred()))
+
+    def test_str_subclass(self):
+        class MyStr(str):
+            pass
+
+        generator = _TestingGenerator([MyStr("foo")])
+        assert_equal(["foo"], list(RenderContext(generator)))
+
+
+class _AsyncTestingGenerator(Generator):
+    def __init__(self, items):
+        self._items = items
+
+    async def generate(self):
+        for item in self._items:
+            await asyncio.sleep(0)
+            yield item
+
+
+def _render_async(generator):
+    async def render():
+        return [s async for s in generator.aiter()]
+
+    return asyncio.run(render())
+
+
+class AsyncGeneratorTest(TestCase):
+    def test_aiter_sync_only(self):
+        inner = _TestingGenerator([b"bar", "ß"])
+        generator = _TestingGenerator(["foo", inner])
+        assert_equal([b"foo", b"bar", b"\xc3\x9f"], _render_async(generator))
+
+    def test_aiter_async(self):
+        inner = _AsyncTestingGenerator(["bar"])
+        generator = _AsyncTestingGenerator(["foo", inner, b"baz"])
+        assert_equal([b"foo", b"bar", b"baz"], _render_async(generator))
+
+    def test_aiter_mixed(self):
+        element = Element("div")
+        inner = _TestingGenerator(["a", _AsyncTestingGenerator(["b"]), "c"])
+        element.append(_AsyncTestingGenerator([inner, Element("p")]))
+        element.append("d")
+        assert_equal(
+            [b"<div>", b"a", b"b", b"c", b"<p>", b"</p>", b"d", b"</div>"],
+            _render_async(element),
+        )
+
+    def test_aiter_async_generate_children(self):
+        class MyElement(NonVoidElement):
+            async def generate_children(self):
+                yield "foo"
+
+        element = Element("div")
+        element.append(MyElement("p"))
+        assert_equal(
+            [b"<div>", b"<p>", b"foo", b"</p>", b"</div>"],
+            _render_async(element),
+        )
+
+    def test_aiter_iterator_generator(self):
+        async def items() -> AsyncIterator[str]:
+            yield "foo"
+            yield "bar"
+
+        generator = IteratorGenerator(items())
+        assert_equal([b"foo", b"bar"], _render_async(generator))
+
+    def test_aiter_invalid_item(self):
+        generator = _AsyncTestingGenerator([5])
+        with assert_raises(TypeError):
+            _render_async(generator)
+
+    def test_render_async_synchronously(self):
+        generator = _TestingGenerator(["foo", _AsyncTestingGenerator([])])
+        with assert_raises(TypeError):
+            str(generator)
+
+    def test_render_async_children_synchronously(self):
+        class MyElement(NonVoidElement):
+            async def generate_children(self):
+                yield "foo"
+
+        with assert_raises(TypeError):
+            list(iter(MyElement("p")))
+
+
+class RenderBudgetTest(TestCase):
+    def test_no_limits(self):
+        generator = _TestingGenerator(["foo", _TestingGenerator(["bar"])])
+        assert_equal("foobar", generator.render_str(budget=RenderBudget()))
+
+    def test_max_bytes(self):
+        budget = RenderBudget(max_bytes=6)
+        generator = _TestingGenerator(["foo", "bar"])
+        assert_equal("foobar", generator.render_str(budget=budget))
+        generator = _TestingGenerator(["foo", "bar", "baz"])
+        with assert_raises(RenderBudgetExceeded):
+            generator.render_str(budget=budget)
+
+    def test_max_bytes_partial_output(self):
+        generator = _TestingGenerator(["foo", "bar", "baz"])
+        context = RenderContext(generator, RenderBudget(max_bytes=6))
+        iterator = iter(context)
+        assert_equal(["foo", "bar"], [next(iterator), next(iterator)])
+        with assert_raises(RenderBudgetExceeded):
+            next(iterator)
+
+    def test_max_nodes(self):
+        generator = _TestingGenerator(
+            [_TestingGenerator(["foo"]), _TestingGenerator(["bar"])]
+        )
+        with assert_raises(RenderBudgetExceeded):
+            generator.render_str(budget=RenderBudget(max_nodes=2))
+        assert_equal(
+            "foobar", generator.render_str(budget=RenderBudget(max_nodes=3))
+        )
+
+    def test_max_time(self):
+        class SlowGenerator(Generator):
+            def generate(self):
+                while True:
+                    sleep(0.01)
+                    yield "x"
+
+        with assert_raises(RenderBudgetExceeded):
+            SlowGenerator().render_str(budget=RenderBudget(max_time=0.05))
+
+    def test_fallback_closes_elements(self):
+        inner = Element("div")
+        inner.append(Element("span"))
+        inner.append(Element("span"))
+        outer = Element("div")
+        outer.extend([inner, "after"])
+        budget = RenderBudget(max_nodes=3, fallback="<...>")
+        assert_equal(
+            "<div><div><span></span>&lt;...&gt;</div></div>",
+            outer.render_str(budget=budget),
+        )
+
+    def test_fallback_on_end_tag(self):
+        inner = Element("div")
+        inner.append("foo")
+        outer = Element("div")
+        outer.append(inner)
+        budget = RenderBudget(max_bytes=13, fallback="...")
+        assert_equal(
+            "<div><div>foo...</div></div>", outer.render_str(budget=budget)
+        )
+
+    def test_fallback_on_end_tag_of_empty_element(self):
+        outer = Element("div")
+        outer.append(Element("span"))
+        budget = RenderBudget(max_bytes=11, fallback="...")
+        assert_equal(
+            "<div><span>...</span></div>", outer.render_str(budget=budget)
+        )
+
+    def test_fallback_on_end_tag_profiled(self):
+        from htmlgen import RenderProfiler
+
+        inner = Element("div")
+        inner.append("foo")
+        outer = Element("div")
+        outer.append(inner)
+        budget = RenderBudget(max_bytes=13, fallback="...")
+        with RenderProfiler():
+            output = outer.render_str(budget=budget)
+        assert_equal("<div><div>foo...</div></div>", output)
+
+    def test_fallback_on_start_tag_profiled(self):
+        from htmlgen import RenderProfiler
+
+        outer = Element("div")
+        for text in ["foo", "bar"]:
+            inner = Element("div")
+            inner.append(text)
+            outer.append(inner)
+        budget = RenderBudget(max_bytes=7, fallback="...")
+        assert_equal("<div>...</div>", outer.render_str(budget=budget))
+        with RenderProfiler():
+            output = outer.render_str(budget=budget)
+        assert_equal("<div>...</div>", output)
+
+    def test_max_bytes_counts_encoded_bytes(self):
+        generator = _TestingGenerator(["ä", "ö"])
+        budget = RenderBudget(max_bytes=3, fallback="!")
+        assert_equal("ä!", generator.render_str(budget=budget))
+
+    def test_fallback_generator(self):
+        generator = _TestingGenerator(["foo", "bar"])
+        budget = RenderBudget(max_bytes=4, fallback=Element("hr"))
+        assert_equal("foo<hr></hr>", generator.render_str(budget=budget))
+
+    def test_close_generators(self):
+        closed = []  # type: List[str]
+
+        class ClosingGenerator(Generator):
+            def __init__(self, name, items):
+                self._name = name
+                self._items = items
+
+            def generate(self):
+                try:
+                    for item in self._items:
+                        yield item
+                finally:
+                    closed.append(self._name)
+
+        inner = ClosingGenerator("inner", ["foo", "bar"])
+        outer = ClosingGenerator("outer", [inner, "baz"])
+        budget = RenderBudget(max_bytes=4, fallback="")
+        assert_equal("foo", outer.render_str(budget=budget))
+        assert_equal(["inner", "outer"], closed)
+
+    def test_iter_chunks(self):
+        generator = _TestingGenerator(["foo", "bar", "baz"])
+        budget = RenderBudget(max_bytes=6, fallback="!")
+        chunks = generator.iter_chunks(min_size=1, budget=budget)
+        assert_equal([b"foo", b"bar", b"!"], list(chunks))
+
+    def test_write_to(self):
+        generator = _TestingGenerator(["foo", "bar", "baz"])
+        stream = BytesIO()
+        with assert_raises(RenderBudgetExceeded):
+            generator.write_to(stream, budget=RenderBudget(max_bytes=6))
+
+    def test_aiter(self):
+        closed = Event()
+
+        class EndlessGenerator(Generator):
+            async def generate(self):
+                try:
+                    while True:
+                        yield "x"
+                finally:
+                    closed.set()
+
+        element = Element("div")
+        element.append(EndlessGenerator())
+        budget = RenderBudget(max_bytes=10, fallback="!")
+
+        async def render():
+            return b"".join([s async for s in element.aiter(budget=budget)])
+
+        assert_equal(b"<div>xxxxx!</div>", asyncio.run(render()))
+        assert_true(closed.is_set())
+
+    def test_aiter_fallback_on_end_tag(self):
+        inner = Element("div")
+        inner.append(_AsyncTestingGenerator(["xx"] * 10))
+        outer = Element("div")
+        outer.append(inner)
+        budget = RenderBudget(max_bytes=30, fallback="!")
+
+        async def render():
+            return b"".join([s async for s in outer.aiter(budget=budget)])
+
+        assert_equal(
+            b"<div><div>" + b"x" * 20 + b"!</div></div>",
+            asyncio.run(render()),
+        )
+
+    def test_aiter_exceeded(self):
+        generator = _AsyncTestingGenerator(["foo", "bar", "baz"])
+        with assert_raises(RenderBudgetExceeded):
+
+            async def render():
+                budget = RenderBudget(max_bytes=6)
+                return [s async for s in generator.aiter(budget=budget)]
+
+            asyncio.run(render())
+
 
 class NullGeneratorTest(TestCase):
     def test_generate(self):
@@ -77,6 +625,198 @@ class IteratorGeneratorTest(TestCase):
         assert_equal([b"foo", b"bar"], list(iter(generator)))
 
 
+class FutureGeneratorTest(TestCase):
+    def setUp(self):
+        self.executor = ThreadPoolExecutor(max_workers=5)
+
+    def tearDown(self):
+        self.executor.shutdown()
+
+    def test_string_result(self):
+        generator = FutureGenerator.submit(self.executor, lambda: "<foo>")
+        assert_equal("&lt;foo&gt;", str(generator))
+
+    def test_generator_result(self):
+        def create():
+            return _TestingGenerator(["<foo>"])
+
+        generator = FutureGenerator.submit(self.executor, create)
+        assert_equal("<foo>", str(generator))
+
+    def test_arguments(self):
+        generator = FutureGenerator.submit(
+            self.executor, "{}-{x}".format, "a", x="b"
+        )
+        assert_equal("a-b", str(generator))
+
+    def test_future(self):
+        future = Future()  # type: Future[str]
+        future.set_result("foo")
+        assert_equal("foo", str(FutureGenerator(future)))
+
+    def test_exception(self):
+        def fail():
+            raise ValueError()
+
+        generator = FutureGenerator.submit(self.executor, fail)
+        with assert_raises(ValueError):
+            str(generator)
+
+    def test_run_concurrently(self):
+        def slow(i):
+            sleep(0.2)
+            return str(i)
+
+        start = monotonic()
+        generator = ChildGenerator()
+        generator.extend(
+            [FutureGenerator.submit(self.executor, slow, i) for i in range(5)]
+        )
+        assert_equal("01234", str(generator))
+        assert_true(monotonic() - start < 0.6)
+
+    def test_aiter(self):
+        started = Event()
+        finish = Event()
+
+        def slow():
+            started.set()
+            finish.wait(5)
+            return "foo"
+
+        generator = FutureGenerator.submit(self.executor, slow)
+
+        async def release():
+            await asyncio.sleep(0)
+            started.wait(5)
+            finish.set()
+
+        async def render():
+            task = asyncio.ensure_future(release())
+            result = [s async for s in generator.aiter()]
+            await task
+            return result
+
+        assert_equal([b"foo"], asyncio.run(render()))
+
+
+class FrozenGeneratorTest(TestCase):
+    def test_output(self):
+        inner = _TestingGenerator(["bar", b"b\xc3\xa4z"])
+        generator = FrozenGenerator(_TestingGenerator(["foo", inner]))
+        assert_equal("foobarbäz", generator.html)
+        assert_equal([b"foobarb\xc3\xa4z"], list(iter(generator)))
+
+    def test_single_item(self):
+        element = Element("div")
+        element.append(Element("span"))
+        element.append("Test")
+        generator = _TestingGenerator(["<", element.freeze(), ">"])
+        assert_equal(
+            ["<", "<div><span></span>Test</div>", ">"],
+            list(RenderContext(generator)),
+        )
+
+    def test_changes_ignored(self):
+        element = Element("div")
+        frozen_element = element.freeze()
+        element.append("Test")
+        element.set_attribute("foo", "bar")
+        assert_equal("<div></div>", str(frozen_element))
+
+    def test_render_once(self):
+        calls = []  # type: List[None]
+
+        class CountingGenerator(Generator):
+            def generate(self):
+                calls.append(None)
+                yield "x"
+
+        generator = CountingGenerator().freeze()
+        str(generator)
+        str(generator)
+        assert_equal(1, len(calls))
+
+    def test_frozen_string(self):
+        assert_equal("&lt;&gt;", frozen("<>").html)
+
+    def test_frozen_generator(self):
+        assert_equal("<>", frozen(_TestingGenerator(["<>"])).html)
+
+    def test_frozen_frozen(self):
+        generator = frozen("foo")
+        assert_is(generator, frozen(generator))
+
+    def test_deferred(self):
+        from htmlgen import Deferred
+
+        with assert_raises(ValueError):
+            FrozenGenerator(_TestingGenerator([Deferred("Slow")]))
+
+    def test_async(self):
+        with assert_raises(TypeError):
+            FrozenGenerator(_AsyncTestingGenerator(["foo"]))
+
+    def test_budget(self):
+        generator = _TestingGenerator([frozen(Element("div"))])
+        budget = RenderBudget(max_nodes=2)
+        assert_equal("<div></div>", generator.render_str(budget))
+
+
+class InternTableTest(TestCase):
+    def test_identical_trees(self):
+        table = InternTable()
+        first = table.intern(Element("span"))
+        second = table.intern(Element("span"))
+        assert_is_instance(first, FrozenGenerator)
+        assert_is(first, second)
+        assert_equal("<span></span>", first.html)
+        assert_equal(1, len(table))
+
+    def test_different_trees(self):
+        table = InternTable()
+        first = table.intern(Element("span"))
+        second = table.intern(Element("div"))
+        assert_is_not(first, second)
+        assert_equal(2, len(table))
+
+    def test_string(self):
+        table = InternTable()
+        generator = table.intern("<>")
+        assert_equal("&lt;&gt;", generator.html)
+        assert_is(generator, table.intern(frozen("<>")))
+
+    def test_frozen_generator_is_shared(self):
+        table = InternTable()
+        generator = frozen("foo")
+        assert_is(generator, table.intern(generator))
+        assert_is(generator, table.intern("foo"))
+
+    def test_unused_generators_are_removed(self):
+        table = InternTable()
+        table.intern("foo")
+        assert_equal(0, len(table))
+
+    def test_clear(self):
+        table = InternTable()
+        generator = table.intern("foo")
+        table.clear()
+        assert_equal(0, len(table))
+        assert_is_not(generator, table.intern("foo"))
+
+    def test_changes_ignored(self):
+        table = InternTable()
+        element = Element("div")
+        generator = table.intern(element)
+        element.append("Test")
+        assert_equal("<div></div>", str(table.intern(Element("div"))))
+        assert_is(generator, table.intern(Element("div")))
+
+    def test_interned(self):
+        generator = interned(Element("br"))
+        assert_is(generator, interned(Element("br")))
+
+
 class ChildGeneratorTest(TestCase):
     def test_append(self):
         generator = ChildGenerator()
@@ -159,6 +899,23 @@ class HTMLChildGeneratorTest(TestCase):
         generator.extend_raw([_TestingGenerator([u"c&2", u"c3"]), u"<c4>"])
         assert_equal([b"c1", b"c&2", b"c3", b"<c4>"], list(iter(generator)))
 
+    def test_none(self):
+        generator = HTMLChildGenerator()
+        with assert_raises(TypeError):
+            generator.append(None)
+        with assert_raises(TypeError):
+            generator.append_raw(None)  # type: ignore
+        with assert_raises(TypeError):
+            generator.extend(["foo", None])  # type: ignore
+        with assert_raises(TypeError):
+            generator.extend_raw(["foo", None])  # type: ignore
+        assert_equal(0, len(generator))
+
+    def test_extend_with_iterator(self):
+        generator = HTMLChildGenerator()
+        generator.extend_raw(iter(["<foo>", "bar"]))
+        assert_equal("<foo>bar", str(generator))
+
     def test_remove_not_found(self):
         generator = HTMLChildGenerator()
         generator.extend(["foo", "bar"])
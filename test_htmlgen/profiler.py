@@ -0,0 +1,194 @@
+import asyncio
+from io import StringIO
+from time import sleep
+from unittest import TestCase
+
+from asserts import (
+    assert_equal,
+    assert_greater_equal,
+    assert_is_none,
+    assert_is_not_none,
+    assert_less,
+    assert_raises,
+    assert_true,
+)
+
+from htmlgen import (
+    Division,
+    LineBreak,
+    RenderProfiler,
+    Span,
+    Table,
+    TableCell,
+    TableRow,
+)
+from htmlgen.generator import FrozenGenerator, Generator, RenderContext
+
+
+class _SlowGenerator(Generator):
+    def generate(self):
+        sleep(0.02)
+        yield "slow"
+
+
+class _AsyncGenerator(Generator):
+    async def generate(self):
+        await asyncio.sleep(0)
+        yield "foo"
+
+
+def _get_profile(profiler, cls):
+    profile = profiler.get_profile(cls)
+    assert profile is not None
+    return profile
+
+
+class RenderProfilerTest(TestCase):
+    def test_not_active(self):
+        profiler = RenderProfiler()
+        str(Division())
+        assert_equal([], profiler.profiles)
+        assert_is_none(RenderContext(Division()).profiler)
+
+    def test_active(self):
+        with RenderProfiler() as profiler:
+            assert_true(RenderContext(Division()).profiler is profiler)
+        assert_is_none(RenderContext(Division()).profiler)
+
+    def test_nested(self):
+        with RenderProfiler() as outer:
+            with RenderProfiler() as inner:
+                str(Span())
+            str(Division())
+        assert_is_not_none(inner.get_profile(Span))
+        assert_is_none(inner.get_profile(Division))
+        assert_is_none(outer.get_profile(Span))
+        assert_is_not_none(outer.get_profile(Division))
+
+    def test_output_unchanged(self):
+        division = Division(Span("foo"), "ß", LineBreak())
+        with RenderProfiler():
+            assert_equal(
+                b"<div><span>foo</span>\xc3\x9f<br/></div>",
+                b"".join(division),
+            )
+
+    def test_counts(self):
+        table = Table()
+        for i in range(3):
+            table.create_simple_row("a", "b")
+        with RenderProfiler() as profiler:
+            str(table)
+        assert_equal(1, _get_profile(profiler, Table).count)
+        assert_equal(3, _get_profile(profiler, TableRow).count)
+        assert_equal(6, _get_profile(profiler, TableCell).count)
+
+    def test_size(self):
+        division = Division(Span("foo"), "ß", LineBreak())
+        with RenderProfiler() as profiler:
+            str(division)
+        assert_equal(13, _get_profile(profiler, Division).size)
+        assert_equal(16, _get_profile(profiler, Span).size)
+        assert_equal(5, _get_profile(profiler, LineBreak).size)
+
+    def test_frozen(self):
+        division = Division(Span("foo").freeze())
+        with RenderProfiler() as profiler:
+            str(division)
+        assert_equal(1, _get_profile(profiler, FrozenGenerator).count)
+        assert_equal(16, _get_profile(profiler, FrozenGenerator).size)
+        assert_is_none(profiler.get_profile(Span))
+
+    def test_time(self):
+        division = Division(Span(_SlowGenerator()))
+        with RenderProfiler() as profiler:
+            str(division)
+        slow = _get_profile(profiler, _SlowGenerator)
+        span = _get_profile(profiler, Span)
+        div = _get_profile(profiler, Division)
+        assert_greater_equal(slow.total_time, 0.02)
+        assert_equal(slow.total_time, slow.cumulative_time)
+        assert_less(span.total_time, 0.02)
+        assert_greater_equal(span.cumulative_time, slow.cumulative_time)
+        assert_less(div.total_time, 0.02)
+        assert_greater_equal(div.cumulative_time, span.cumulative_time)
+        assert_less(div.start_tag_time, div.total_time)
+
+    def test_recursion(self):
+        division = Division(Division(Division()))
+        with RenderProfiler() as profiler:
+            str(division)
+        profile = _get_profile(profiler, Division)
+        assert_equal(3, profile.count)
+        assert_greater_equal(profile.cumulative_time, profile.total_time)
+
+    def test_consumer_time_excluded(self):
+        division = Division(Span("foo"), Span("bar"))
+        with RenderProfiler() as profiler:
+            for _ in division:
+                sleep(0.01)
+        assert_less(_get_profile(profiler, Division).cumulative_time, 0.01)
+
+    def test_generate_returns_sequence(self):
+        class ListGenerator(Generator):
+            def generate(self):
+                return [Span("foo"), "bar"]
+
+        with RenderProfiler() as profiler:
+            assert_equal("<span>foo</span>bar", str(ListGenerator()))
+        assert_equal(1, _get_profile(profiler, Span).count)
+
+    def test_async_not_supported(self):
+        with RenderProfiler():
+            with assert_raises(TypeError):
+                str(Division(_AsyncGenerator()))
+
+    def test_clear(self):
+        with RenderProfiler() as profiler:
+            str(Division())
+        profiler.clear()
+        assert_equal([], profiler.profiles)
+
+
+class FormatStatsTest(TestCase):
+    def setUp(self):
+        self.profiler = RenderProfiler()
+        with self.profiler:
+            str(Division(Span(), Span(), LineBreak()))
+
+    def test_header(self):
+        lines = self.profiler.format_stats().splitlines()
+        assert_equal(
+            ["ncalls", "tottime", "cumtime", "tagtime", "bytes", "class"],
+            lines[0].split(),
+        )
+        assert_equal(4, len(lines))
+
+    def test_sort(self):
+        lines = self.profiler.format_stats("ncalls").splitlines()
+        assert_equal(
+            ["2", "htmlgen.inline.Span"],
+            [lines[1].split()[0], lines[1].split()[-1]],
+        )
+        lines = self.profiler.format_stats("name").splitlines()
+        assert_equal(
+            [
+                "htmlgen.block.Division",
+                "htmlgen.inline.LineBreak",
+                "htmlgen.inline.Span",
+            ],
+            [line.split()[-1] for line in lines[1:]],
+        )
+
+    def test_sort_unknown(self):
+        with assert_raises(ValueError):
+            self.profiler.format_stats("foo")
+
+    def test_limit(self):
+        lines = self.profiler.format_stats(limit=1).splitlines()
+        assert_equal(2, len(lines))
+
+    def test_print_stats(self):
+        stream = StringIO()
+        self.profiler.print_stats(file=stream)
+        assert_equal(self.profiler.format_stats(), stream.getvalue())
@@ -0,0 +1,94 @@
+import os
+import socket
+from threading import Thread
+from typing import List
+from unittest import TestCase
+
+from asserts import assert_equal
+
+from htmlgen.generator import IteratorGenerator
+from htmlgen.sink import FileDescriptorSink, SocketSink, _write_all
+
+
+class WriteAllTest(TestCase):
+    def test_partial_writes(self):
+        written = []  # type: List[bytes]
+
+        def writev(buffers):
+            data = bytes(buffers[0])[:2]
+            written.append(data)
+            return len(data)
+
+        _write_all(writev, [b"foo", b"", b"barbaz"])
+        assert_equal([b"fo", b"o", b"ba", b"rb", b"az"], written)
+
+    def test_write_multiple_buffers(self):
+        calls = []  # type: List[List[bytes]]
+
+        def writev(buffers):
+            calls.append([bytes(b) for b in buffers])
+            return min(7, sum(len(b) for b in buffers))
+
+        _write_all(writev, [b"foo", b"bar", b"baz", b"qux"])
+        assert_equal(
+            [[b"foo", b"bar", b"baz", b"qux"], [b"az", b"qux"]], calls
+        )
+
+
+class FileDescriptorSinkTest(TestCase):
+    def test_write_large(self):
+        read_fd, write_fd = os.pipe()
+        pieces = ["<{}>".format(i) for i in range(100000)]
+        expected = "".join(pieces).encode("ascii")
+        received = []  # type: List[bytes]
+
+        def read():
+            while True:
+                data = os.read(read_fd, 65536)
+                if not data:
+                    break
+                received.append(data)
+
+        reader = Thread(target=read)
+        reader.start()
+        try:
+            sink = FileDescriptorSink(write_fd)
+            IteratorGenerator(pieces).write_to(sink, batch_size=1000)
+        finally:
+            os.close(write_fd)
+            reader.join()
+            os.close(read_fd)
+        assert_equal(expected, b"".join(received))
+
+    def test_write(self):
+        read_fd, write_fd = os.pipe()
+        try:
+            FileDescriptorSink(write_fd).write(b"foo")
+            assert_equal(b"foo", os.read(read_fd, 100))
+        finally:
+            os.close(read_fd)
+            os.close(write_fd)
+
+
+class SocketSinkTest(TestCase):
+    def test_write_large(self):
+        sock1, sock2 = socket.socketpair()
+        pieces = [b"<" + str(i).encode("ascii") + b">" for i in range(100000)]
+        received = []  # type: List[bytes]
+
+        def read():
+            while True:
+                data = sock2.recv(65536)
+                if not data:
+                    break
+                received.append(data)
+
+        reader = Thread(target=read)
+        reader.start()
+        try:
+            IteratorGenerator(pieces).write_to(SocketSink(sock1))
+        finally:
+            sock1.close()
+            reader.join()
+            sock2.close()
+        assert_equal(b"".join(pieces), b"".join(received))
@@ -1,8 +1,18 @@
+import asyncio
+from typing import List
 from unittest import TestCase
 
 from asserts import assert_equal, assert_true
 
-from htmlgen import Table, TableHead, TableRow, TableCell, ColumnGroup, Span
+from htmlgen import (
+    RenderBudget,
+    Table,
+    TableHead,
+    TableRow,
+    TableCell,
+    ColumnGroup,
+    Span,
+)
 
 
 class TableTest(TestCase):
@@ -182,6 +192,61 @@ class TableTest(TestCase):
         table = MyTable()
         assert_equal("<table><tbody><tr></tr></tbody></table>", str(table))
 
+    def test_generate_rows_budget(self):
+        generated = []  # type: List[int]
+
+        class MyTable(Table):
+            def generate_rows(self):
+                for i in range(200000):
+                    generated.append(i)
+                    yield TableRow()
+
+        budget = RenderBudget(max_nodes=5, fallback="x")
+        assert_equal(
+            "<table><tbody><tr></tr><tr></tr>x</tbody></table>",
+            MyTable().render_str(budget=budget),
+        )
+        assert_true(len(generated) < 10)
+
+    def test_generate_rows_strings(self):
+        class MyTable(Table):
+            def generate_rows(self):
+                yield "<tr>"
+
+        assert_equal(
+            "<table><tbody>&lt;tr&gt;</tbody></table>", str(MyTable())
+        )
+
+    def test_generate_rows_async(self):
+        class MyTable(Table):
+            async def generate_header_rows(self):
+                yield TableRow()
+
+            async def generate_rows(self):
+                for i in range(2):
+                    await asyncio.sleep(0)
+                    yield TableRow()
+
+        async def render():
+            return b"".join([s async for s in MyTable().aiter()])
+
+        assert_equal(
+            b"<table><thead><tr></tr></thead>"
+            b"<tbody><tr></tr><tr></tr></tbody></table>",
+            asyncio.run(render()),
+        )
+
+    def test_generate_rows_async_empty(self):
+        class MyTable(Table):
+            async def generate_rows(self):
+                if False:
+                    yield TableRow()
+
+        async def render():
+            return b"".join([s async for s in MyTable().aiter()])
+
+        assert_equal(b"<table></table>", asyncio.run(render()))
+
 
 class TableHeadTest(TestCase):
     def test_create_row(self):
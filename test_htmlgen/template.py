@@ -0,0 +1,141 @@
+from unittest import TestCase
+
+from asserts import assert_equal, assert_raises
+
+from htmlgen import (
+    Deferred,
+    Division,
+    Element,
+    Link,
+    Paragraph,
+    RenderContext,
+    Slot,
+    Span,
+    Template,
+    TemplateGenerator,
+    TextSlot,
+    compile_template,
+)
+from htmlgen.generator import IteratorGenerator
+
+
+class SlotTest(TestCase):
+    def test_invalid_name(self):
+        with assert_raises(ValueError):
+            Slot("")
+        with assert_raises(ValueError):
+            Slot("a\0b")
+        with assert_raises(ValueError):
+            TextSlot("")
+
+    def test_name_must_be_identifier(self):
+        for name in ["a&b", "a<b", "a>b", 'a"b', "a'b", "a b", "1a"]:
+            with assert_raises(ValueError):
+                Slot(name)
+            with assert_raises(ValueError):
+                TextSlot(name)
+
+    def test_name(self):
+        assert_equal("foo", Slot("foo").name)
+        assert_equal("foo", TextSlot("foo").name)
+
+
+class CompileTemplateTest(TestCase):
+    def test_static(self):
+        template = compile_template(Division(Span("Test")))
+        assert_equal(["<div><span>Test</span></div>"], template.segments)
+        assert_equal([], template.slots)
+        assert_equal("<div><span>Test</span></div>", str(template.render()))
+
+    def test_segments(self):
+        division = Division(Span(Slot("a")), TextSlot("b"))
+        division.set_attribute("title", TextSlot("c"))
+        template = compile_template(division)
+        assert_equal(
+            ['<div title="', '"><span>', "</span>", "</div>"],
+            template.segments,
+        )
+        assert_equal([("t", "c"), ("c", "a"), ("t", "b")], template.slots)
+
+    def test_single_items(self):
+        template = compile_template(Division(Slot("a")))
+        generator = template.render(a=Span("x"))
+        assert_equal(
+            ["<div>", "<span>", "x", "</span>", "</div>"],
+            list(RenderContext(generator)),
+        )
+
+    def test_text_values_escaped(self):
+        division = Division(Slot("a"), TextSlot("b"))
+        division.set_attribute("title", TextSlot("c"))
+        template = compile_template(division)
+        assert_equal(
+            '<div title="&quot;&lt;C&gt;&quot;">&lt;A&gt;&amp;B</div>',
+            str(template.render(a="<A>", b="&B", c='"<C>"')),
+        )
+
+    def test_generator_value(self):
+        template = compile_template(Division(Slot("content")))
+        generator = template.render(content=IteratorGenerator(["<b>", "x"]))
+        assert_equal("<div><b>x</div>", str(generator))
+
+    def test_generator_in_text_slot(self):
+        template = compile_template(Division(TextSlot("a")))
+        generator = template.render(a=Span())
+        with assert_raises(TypeError):
+            str(generator)
+
+    def test_repeated_slot(self):
+        division = Division(Slot("a"), Paragraph(Slot("a")))
+        division.id = TextSlot("a")
+        template = compile_template(division)
+        assert_equal(
+            '<div id="x">x<p>x</p></div>', str(template.render(a="x"))
+        )
+
+    def test_css_classes_and_styles(self):
+        element = Element("div")
+        element.add_css_classes("static", TextSlot("cls"))
+        element.set_style("color", TextSlot("color"))
+        template = compile_template(element)
+        assert_equal(
+            '<div class="x static" style="color: red"></div>',
+            str(template.render(cls="x", color="red")),
+        )
+
+    def test_link(self):
+        template = compile_template(Link(TextSlot("url"), Slot("label")))
+        assert_equal(
+            '<a href="/foo">Foo</a>',
+            str(template.render(url="/foo", label="Foo")),
+        )
+
+    def test_render_repeatedly(self):
+        template = compile_template(Division(Slot("a")))
+        assert_equal("<div>1</div>", str(template.render(a="1")))
+        assert_equal("<div>2</div>", str(template.render(a="2")))
+
+    def test_missing_value(self):
+        template = compile_template(Division(Slot("a"), Slot("b")))
+        with assert_raises(TypeError):
+            template.render(a="x")
+
+    def test_unknown_value(self):
+        template = compile_template(Division(Slot("a")))
+        with assert_raises(TypeError):
+            template.render(a="x", c="y")
+
+    def test_nul_characters(self):
+        with assert_raises(ValueError):
+            compile_template(Division("\0"))
+        with assert_raises(ValueError):
+            compile_template(Division("\0x\0"))
+
+    def test_deferred(self):
+        with assert_raises(ValueError):
+            compile_template(Division(Deferred("Slow")))
+
+    def test_types(self):
+        template = compile_template(Division(Slot("a")))
+        assert_equal(Template, type(template))
+        assert_equal(TemplateGenerator, type(template.render(a="")))